@@ -0,0 +1,236 @@
+# Benchmarks the pathfinder on seeded maps and compares the results against a stored baseline
+"""
+Usage:
+    python Benchmark.py                  Run every case and compare against the baseline
+    python Benchmark.py --save           Run every case and store the results as the new baseline
+    python Benchmark.py --sizes 32 128   Only benchmark some map sizes
+
+Exits with status 1 if any case regressed against the baseline.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import List, Tuple, Dict, Callable, Any, Optional
+
+# Import Config, MapGenerator and the pathfinder from other modules
+from Config import Config
+from MapGen import MapGenerator
+from Pathfinding import Pathfinder, FlowField, IncrementalPlanner
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+MAP_SIZES = [32, 128, 512]
+MAP_SEED = 1234  # Seed for map generation, so every run benchmarks the same maps
+REPEATS = 3  # Timed runs per case, the fastest one is reported
+BARRICADES = 40  # Random barricades placed before the mass replan
+REPLANNING_ENEMIES = 100  # Enemy positions replanned after the barricades
+TIME_TOLERANCE = 0.25  # Allowed slowdown against the baseline before a case counts as regressed
+TIME_SLACK_MS = 1.0  # Slowdowns smaller than this are timer noise, whatever the ratio
+
+
+def generate_map(size: int) -> MapGenerator:
+    """Generate the seeded benchmark map for one size"""
+    return MapGenerator(size, size, MAP_SEED + size)
+
+
+def random_walkable_tiles(pathfinder: Pathfinder, count: int, seed: int) -> List[Tuple[int, int]]:
+    """Pick walkable tiles with a private random generator so the game's RNG is untouched"""
+    rng = random.Random(seed)
+    tiles = []
+    while len(tiles) < count:
+        x = rng.randrange(pathfinder.width)
+        y = rng.randrange(pathfinder.height)
+        if pathfinder.is_walkable(x, y):
+            tiles.append((x, y))
+    return tiles
+
+
+def case_single(pathfinder: Pathfinder, map_gen: MapGenerator) -> Tuple[int, int]:
+    """One query from the first START point to the base"""
+    pathfinder.find_path(map_gen.start_points[0], map_gen.end_point)
+    return pathfinder.nodes_expanded, pathfinder.nodes_evaluated
+
+
+def case_all_starts(pathfinder: Pathfinder, map_gen: MapGenerator) -> Tuple[int, int]:
+    """One query per START point, as used for the START path previews"""
+    expanded = 0
+    evaluated = 0
+    for start in map_gen.start_points:
+        pathfinder.find_path(start, map_gen.end_point)
+        expanded += pathfinder.nodes_expanded
+        evaluated += pathfinder.nodes_evaluated
+    return expanded, evaluated
+
+
+def case_mass_replan(pathfinder: Pathfinder, map_gen: MapGenerator) -> Tuple[int, int]:
+    """Place random barricades, then replan a crowd of enemies from scattered tiles"""
+    for x, y in random_walkable_tiles(pathfinder, BARRICADES, MAP_SEED):
+        index = y * pathfinder.width + x
+        pathfinder.update_cost(x, y, pathfinder.costs[index] + Config.BARRICADE_COST)
+
+    expanded = 0
+    evaluated = 0
+    for start in random_walkable_tiles(pathfinder, REPLANNING_ENEMIES, MAP_SEED + 1):
+        pathfinder.find_path(start, map_gen.end_point)
+        expanded += pathfinder.nodes_expanded
+        evaluated += pathfinder.nodes_evaluated
+    return expanded, evaluated
+
+
+def route_barricade(pathfinder: Pathfinder, map_gen: MapGenerator) -> Tuple[int, int]:
+    """Middle tile of the first START's route, where a player's barricade cuts off most of the field"""
+    route = pathfinder.find_path(map_gen.start_points[0], map_gen.end_point)
+    return route[len(route) // 2]
+
+
+def setup_field_repair(pathfinder: Pathfinder, map_gen: MapGenerator) -> IncrementalPlanner:
+    """Shared field toward the base, as the game keeps it"""
+    return IncrementalPlanner(pathfinder, map_gen.end_point)
+
+
+def case_field_repair(planner: IncrementalPlanner, map_gen: MapGenerator) -> Tuple[int, int]:
+    """Barricade a tile on the route and repair the shared field"""
+    x, y = route_barricade(planner.pathfinder, map_gen)
+    index = y * planner.pathfinder.width + x
+    planner.update_cost(x, y, planner.pathfinder.costs[index] + Config.BARRICADE_COST)
+    planner.compute()
+    return planner.nodes_expanded, 0
+
+
+def setup_field_rebuild(pathfinder: Pathfinder, map_gen: MapGenerator) -> Pathfinder:
+    """Same barricade as the repair case, placed before the clock starts"""
+    x, y = route_barricade(pathfinder, map_gen)
+    index = y * pathfinder.width + x
+    pathfinder.update_cost(x, y, pathfinder.costs[index] + Config.BARRICADE_COST)
+    return pathfinder
+
+
+def case_field_rebuild(pathfinder: Pathfinder, map_gen: MapGenerator) -> Tuple[int, int]:
+    """Build the shared field from scratch, the work field_repair has to beat"""
+    field = FlowField(pathfinder, map_gen.end_point)
+    return field.nodes_expanded, 0
+
+
+CASES: Dict[str, Callable[[Any, MapGenerator], Tuple[int, int]]] = {
+    'single': case_single,
+    'all_starts': case_all_starts,
+    'mass_replan': case_mass_replan,
+    'field_repair': case_field_repair,
+    'field_build': case_field_rebuild,
+}
+
+# Untimed preparation for cases that do not start from a fresh pathfinder
+SETUPS: Dict[str, Callable[[Pathfinder, MapGenerator], Any]] = {
+    'field_repair': setup_field_repair,
+    'field_build': setup_field_rebuild,
+}
+
+
+def run_case(case: Callable, map_gen: MapGenerator, size: int,
+             setup: Optional[Callable] = None) -> Dict[str, float]:
+    """Time a case on fresh pathfinders, then run it once more under tracemalloc for peak memory"""
+    best_time = float('inf')
+    counters = (0, 0)
+    for _ in range(REPEATS):
+        pathfinder = Pathfinder(size, size, map_gen)
+        subject = setup(pathfinder, map_gen) if setup else pathfinder
+        started = time.perf_counter()
+        counters = case(subject, map_gen)
+        best_time = min(best_time, time.perf_counter() - started)
+
+    # Tracing slows everything down, so memory is measured in a separate run
+    pathfinder = Pathfinder(size, size, map_gen)
+    subject = setup(pathfinder, map_gen) if setup else pathfinder
+    tracemalloc.start()
+    case(subject, map_gen)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'time_ms': round(best_time * 1000, 2),
+        'nodes_expanded': counters[0],
+        'nodes_evaluated': counters[1],
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def report_weighted(map_gen: MapGenerator, size: int):
+    """Replan the crowd with the enemies' weighted A*, sampling every search against an exact one"""
+    pathfinder = Pathfinder(size, size, map_gen)
+    sample_every = Config.WEIGHTED_SAMPLE_EVERY
+    Config.WEIGHTED_SAMPLE_EVERY = 1
+    try:
+        for start in random_walkable_tiles(pathfinder, REPLANNING_ENEMIES, MAP_SEED + 1):
+            pathfinder.find_path(start, map_gen.end_point, weight=Config.REPLAN_WEIGHT)
+    finally:
+        Config.WEIGHTED_SAMPLE_EVERY = sample_every
+    print(f"  {'weighted':<12} {pathfinder.weighted_speedup:>10.2f}x fewer expanded  "
+          f"{pathfinder.weighted_cost_ratio:.3f}x route cost  (weight {Config.REPLAN_WEIGHT}, "
+          f"{pathfinder.weighted_samples} samples)")
+
+
+def compare(name: str, result: Dict[str, float], baseline: Dict[str, float]) -> bool:
+    """Print one case next to its baseline, returns True if it regressed"""
+    if not baseline:
+        print(f"  {name:<12} {result['time_ms']:>10.2f} ms  {result['nodes_expanded']:>9} expanded  "
+              f"{result['nodes_evaluated']:>9} evaluated  {result['peak_kb']:>9.1f} KB  (no baseline)")
+        return False
+
+    time_ratio = result['time_ms'] / baseline['time_ms'] if baseline['time_ms'] else 1.0
+    slower = result['time_ms'] - baseline['time_ms'] > TIME_SLACK_MS
+    regressed = (slower and time_ratio > 1 + TIME_TOLERANCE or
+                 result['nodes_expanded'] > baseline['nodes_expanded'] or
+                 result['nodes_evaluated'] > baseline['nodes_evaluated'])
+    print(f"  {name:<12} {result['time_ms']:>10.2f} ms ({time_ratio:5.2f}x)  "
+          f"{result['nodes_expanded']:>9} expanded ({result['nodes_expanded'] - baseline['nodes_expanded']:+})  "
+          f"{result['nodes_evaluated']:>9} evaluated ({result['nodes_evaluated'] - baseline['nodes_evaluated']:+})  "
+          f"{result['peak_kb']:>9.1f} KB ({result['peak_kb'] - baseline['peak_kb']:+.1f})"
+          f"{'  REGRESSED' if regressed else ''}")
+    return regressed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the pathfinder on seeded maps")
+    parser.add_argument('--save', action='store_true', help="store the results as the new baseline")
+    parser.add_argument('--sizes', type=int, nargs='+', default=MAP_SIZES, help="map sizes to benchmark")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    results = {}
+    regressions = 0
+    for size in args.sizes:
+        map_gen = generate_map(size)
+        print(f"{size}x{size} map")
+        results[str(size)] = {}
+        for name, case in CASES.items():
+            result = run_case(case, map_gen, size, SETUPS.get(name))
+            results[str(size)][name] = result
+            if compare(name, result, baseline.get(str(size), {}).get(name, {})):
+                regressions += 1
+        report_weighted(map_gen, size)
+
+    if args.save:
+        # Keep baseline entries for sizes that were not run this time
+        baseline.update(results)
+        with open(BASELINE_PATH, 'w') as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+        print(f"Baseline saved to {BASELINE_PATH}")
+        return 0
+
+    if regressions:
+        print(f"{regressions} case(s) regressed")
+        return 1
+    return 0
+
+
+# Program Entry Point
+if __name__ == "__main__":
+    sys.exit(main())
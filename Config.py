@@ -57,10 +57,39 @@ class Config:
     # Enemy Scaling
     ENEMY_HEALTH_SCALING = 5  # Add this amount of HP per wave
     
+    # Map generation
+    VECTORIZED_CLUSTERS = False  # Set to True to grow terrain clusters with NumPy when it is installed
+    MAP_SEED = None  # Set to an int to play the same map every game
+    MAP_POOL_DIR = 'maps'  # Pregenerated maps, relative to the game folder
+    MAP_POOL_SIZE = 32  # New seeds are generated until the pool holds this many maps per size
+    PRELOAD_NEXT_MAP = True  # Build the next map in a background thread so restarting only swaps it in
+    
     # Start points
     NUM_START_POINTS = 3
     MIN_START_END_DISTANCE = 8  # Manhattan distance
     
+    # Pathfinding
+    USE_FLOW_FIELD = True  # Set to False to give every enemy its own A* query
+    FIELD_REBUILD_FRACTION = 0.25  # Incremental field repairs that cut off more of the map than this rebuild from the goals instead
+    PATH_CACHE_SIZE = 64  # Max (start, goal) results kept by the pathfinder's LRU cache
+    COST_LOG_SIZE = 4096  # Recent cost changes kept for incremental consumers
+    HIERARCHICAL_SEARCH = False  # Set to True to answer find_path on large maps with HPA* (faster, not always shortest)
+    HIERARCHICAL_MIN_TILES = 128 * 128  # Maps at least this large use HPA* when HIERARCHICAL_SEARCH is on
+    HPA_CLUSTER_SIZE = 16  # Cluster width/height in tiles
+    NUM_LANDMARKS = 0  # Set above 0 to tighten the A* heuristic with landmark (ALT) distance tables
+    BIDIRECTIONAL_SEARCH = False  # Set to True to search from both ends at once in find_path
+    REPLAN_WEIGHT = 1.5  # Heuristic weight for enemy replans, paths cost at most this times the optimum
+    WEIGHTED_SAMPLE_EVERY = 0  # Metrics switch: re-run every Nth weighted search exactly (unbudgeted) to measure speedup and cost ratio, 0 = off
+    THREAT_AWARE_DIFFICULTIES = ['HARD']  # Difficulties where enemies route around tower kill zones
+    THREAT_COST_PER_DPS = 0.1  # Extra movement cost per point of tower damage per second on a tile
+    CROWD_MODE = False  # Set to True so crowds spread over alternative routes (best with USE_FLOW_FIELD)
+    CONGESTION_COST_PER_ENEMY = 2  # Extra movement cost per enemy standing on a tile
+    CONGESTION_MAX_COST = 12  # Cap on the congestion cost of a single tile
+    CONGESTION_INTERVAL = 30  # Frames between occupancy recounts and the shared field repair
+    PATH_BUDGET_MS = 4.0  # Time per frame spent on queued path requests
+    PATH_STEP_EXPANSIONS = 256  # Tiles expanded between budget checks
+    PATH_WORKER = None  # Set to 'thread' or 'process' to replan in a background worker
+    
     # Colors
     COLOR_BG = (20, 20, 30)
     COLOR_GRID = (40, 40, 50)
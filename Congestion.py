@@ -0,0 +1,45 @@
+# Handles crowd congestion: enemy occupancy per tile turned into a path cost overlay
+from array import array
+from typing import List, Tuple, Dict
+
+# Import Config and Enemy from other modules
+from Config import Config
+from Enemy import Enemy
+
+
+class CongestionMap:
+    """
+    Enemy occupancy per tile and the extra movement cost it causes
+
+    update() recounts the enemies and only touches tiles that were or are now
+    occupied, so a refresh costs time in proportion to the crowd rather than
+    the map. The caller decides how often to refresh and feeds the changed
+    tiles to the pathfinder.
+    """
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.counts: Dict[int, int] = {}  # Flat index -> enemies on that tile, occupied tiles only
+        self.costs = array('i', [0]) * (width * height)  # Extra movement cost from congestion
+
+    def update(self, enemies: List[Enemy]) -> List[Tuple[int, int]]:
+        """Recount the enemies on each tile, returns the tiles whose congestion cost changed"""
+        width = self.width
+        counts: Dict[int, int] = {}
+        for enemy in enemies:
+            if enemy.alive and not enemy.arrived:
+                x = int(enemy.x / Config.TILE_SIZE)
+                y = int(enemy.y / Config.TILE_SIZE)
+                if 0 <= x < width and 0 <= y < self.height:
+                    index = y * width + x
+                    counts[index] = counts.get(index, 0) + 1
+
+        costs = self.costs
+        changed = []
+        for index in counts.keys() | self.counts.keys():
+            cost = min(counts.get(index, 0) * Config.CONGESTION_COST_PER_ENEMY, Config.CONGESTION_MAX_COST)
+            if cost != costs[index]:
+                costs[index] = cost
+                changed.append((index % width, index // width))
+        self.counts = counts
+        return changed
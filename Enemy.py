@@ -1,15 +1,17 @@
 # Handles enemy spawning, movement, and rendering
 import pygame
 import math
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 
-# Import Config from Config module
+# Import Config and the shared path storage from other modules
 from Config import Config
+from PathStore import PathStore
 
 
 class Enemy:
     """Enemy entity"""
     _id = 0
+    paths = PathStore()  # Routes shared by every enemy
     
     def __init__(self, x: float, y: float):
         Enemy._id += 1
@@ -17,46 +19,104 @@ class Enemy:
         self.x = x
         self.y = y
         self.health = Config.ENEMY_HEALTH
-        self.path: List[Tuple[int, int]] = []
-        self.path_index = 0
         self.speed = Config.ENEMY_SPEED
+        
+        # Position on a shared route: (path_id, index) of the tile the path was set from
+        self.path_id: Optional[int] = None
+        self.path_start = 0
+        
+        # Leg from wherever the enemy stood to the route's next tile, then the route's own segments
+        self.lead_start = (x, y)
+        self.lead_direction = (0.0, 0.0)
+        self.lead_length = 0.0
+        self.lead_progress = 0.0
+        self.segment_index = 0
+        self.segment_progress = 0.0  # Distance already covered along the current segment
         self.alive = True
         self.arrived = False
     
-    def set_path(self, path: List[Tuple[int, int]]):
-        """Set path"""
-        self.path = path if path else []
-        self.path_index = 1 if len(path) > 1 else 0
+    def set_path(self, path: List[Tuple[int, int]], index: int = 0):
+        """Follow path from path[index] (the enemy's current tile), sharing storage with identical routes"""
+        self.release_path()
+        self.lead_length = 0.0
+        self.lead_progress = 0.0
+        self.segment_index = 0
+        self.segment_progress = 0.0
+        if not path or len(path) - index < 2:
+            return
+        
+        self.path_id, offset = Enemy.paths.intern(path)
+        self.path_start = offset + index
+        route = Enemy.paths.get(self.path_id)
+        
+        # Walk from the current position to the next tile, then corner to corner along the route
+        next_x, next_y = route.tile(self.path_start + 1)
+        end_x = next_x * Config.TILE_SIZE + Config.TILE_SIZE / 2
+        end_y = next_y * Config.TILE_SIZE + Config.TILE_SIZE / 2
+        dx = end_x - self.x
+        dy = end_y - self.y
+        length = math.sqrt(dx**2 + dy**2)
+        self.lead_start = (self.x, self.y)
+        if length > 0:
+            self.lead_direction = (dx / length, dy / length)
+            self.lead_length = length
+        self.segment_index, self.segment_progress = route.locate(self.path_start + 1)
+    
+    def release_path(self):
+        """Give up this enemy's reference to its shared route"""
+        if self.path_id is not None:
+            Enemy.paths.release(self.path_id)
+            self.path_id = None
+    
+    @property
+    def path(self) -> List[Tuple[int, int]]:
+        """Remaining route as tiles, starting from the tile the path was set from"""
+        if self.path_id is None:
+            return []
+        route = Enemy.paths.get(self.path_id)
+        return [route.tile(i) for i in range(self.path_start, len(route))]
     
     def update(self) -> bool:
-        """Update enemy position"""
+        """Update enemy position by advancing its arc length along the path segments"""
         if not self.alive or self.arrived:
             return False
-        
-        if self.path_index >= len(self.path):
+        if self.path_id is None:
             self.arrived = True
             return False
         
-        # Get next waypoint in pixels
-        grid_x, grid_y = self.path[self.path_index]
-        target_x = grid_x * Config.TILE_SIZE + Config.TILE_SIZE / 2
-        target_y = grid_y * Config.TILE_SIZE + Config.TILE_SIZE / 2
+        # Finish the leg onto the route first
+        remaining = self.speed
+        if self.lead_progress < self.lead_length:
+            left = self.lead_length - self.lead_progress
+            if remaining < left:
+                self.lead_progress += remaining
+                self.x = self.lead_start[0] + self.lead_direction[0] * self.lead_progress
+                self.y = self.lead_start[1] + self.lead_direction[1] * self.lead_progress
+                return True
+            remaining -= left
+            self.lead_progress = self.lead_length
         
-        dx = target_x - self.x
-        dy = target_y - self.y
-        dist = math.sqrt(dx**2 + dy**2)
+        # Carry any distance left at a corner over into the following segment
+        route = Enemy.paths.get(self.path_id)
+        lengths = route.segment_lengths
+        while self.segment_index < len(lengths):
+            left = lengths[self.segment_index] - self.segment_progress
+            if remaining < left:
+                break
+            remaining -= left
+            self.segment_index += 1
+            self.segment_progress = 0.0
         
-        if dist < self.speed:
-            self.x = target_x
-            self.y = target_y
-            self.path_index += 1
-            if self.path_index >= len(self.path):
-                self.arrived = True
-                return False
-        else:
-            self.x += (dx / dist) * self.speed
-            self.y += (dy / dist) * self.speed
+        if self.segment_index >= len(lengths):
+            # Snap onto the final waypoint
+            last_x, last_y = route.tile(len(route) - 1)
+            self.x = last_x * Config.TILE_SIZE + Config.TILE_SIZE / 2
+            self.y = last_y * Config.TILE_SIZE + Config.TILE_SIZE / 2
+            self.arrived = True
+            return False
         
+        self.segment_progress += remaining
+        self.x, self.y = route.segment_point(self.segment_index, self.segment_progress)
         return True
     
     def draw(self, surface, offset_x: int = 0, offset_y: int = 0, sprite=None):
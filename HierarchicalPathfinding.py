@@ -0,0 +1,338 @@
+# Handles hierarchical pathfinding (HPA*) for large maps
+import heapq
+from typing import List, Tuple, Optional, Dict, Set
+
+# Import the impassable cost threshold from the flat pathfinder
+from Pathfinding import IMPASSABLE_COST
+
+
+# Border runs longer than this get a transition at each end instead of one in the middle
+ENTRANCE_SPLIT_LENGTH = 6
+
+# Border directions, each cluster owns the border on its east and south side
+EAST = 0
+SOUTH = 1
+
+
+class HierarchicalPathfinder:
+    """
+    HPA* over a Pathfinder's cost grid
+
+    The grid is split into square clusters. Walkable runs along each cluster
+    border become entrances, and every cluster stores the cheapest in-cluster
+    cost between its own entrances. A query searches this small abstract graph
+    and only then refines the chosen edges into tiles; refined routes are
+    cached until their cluster is rebuilt.
+    """
+    def __init__(self, pathfinder, cluster_size: int):
+        self.pathfinder = pathfinder
+        self.cluster_size = cluster_size
+        self.clusters_x = (pathfinder.width + cluster_size - 1) // cluster_size
+        self.clusters_y = (pathfinder.height + cluster_size - 1) // cluster_size
+
+        self.version = -1  # cost_version the graph was built against (-1 = never built)
+        self.transitions: Dict[Tuple[int, int, int], List[Tuple[int, int]]] = {}  # Border -> tile pairs
+        self.crossings: Dict[int, Set[int]] = {}  # Entrance tile -> tiles across its borders
+        self.entrances: Dict[int, Set[int]] = {}  # Cluster -> entrance tiles inside it
+        self.intra_edges: Dict[int, Dict[int, float]] = {}  # Entrance -> {entrance: in-cluster cost}
+        self.refined: Dict[int, Dict[Tuple[int, int], List[int]]] = {}  # Cluster -> cached edge routes
+
+        # Performance metrics
+        self.nodes_expanded = 0  # Abstract and refinement expansions of the last query
+        self.nodes_evaluated = 0  # Neighbor evaluations of the last query
+        self.clusters_rebuilt = 0  # Clusters rebuilt by the last refresh
+
+    def _cluster_of(self, index: int) -> int:
+        """Get the cluster id containing a flat tile index"""
+        width = self.pathfinder.width
+        return (index // width // self.cluster_size) * self.clusters_x + (index % width) // self.cluster_size
+
+    def _cluster_bounds(self, cluster: int) -> Tuple[int, int, int, int]:
+        """Get (min_x, min_y, max_x, max_y) of a cluster, max values exclusive"""
+        cx = cluster % self.clusters_x
+        cy = cluster // self.clusters_x
+        size = self.cluster_size
+        return (cx * size, cy * size,
+                min((cx + 1) * size, self.pathfinder.width),
+                min((cy + 1) * size, self.pathfinder.height))
+
+    def _border_pairs(self, border: Tuple[int, int, int]) -> List[Tuple[int, int]]:
+        """Get every (inside, outside) tile pair along a cluster's east or south border"""
+        cx, cy, direction = border
+        width = self.pathfinder.width
+        min_x, min_y, max_x, max_y = self._cluster_bounds(cy * self.clusters_x + cx)
+        if direction == EAST:
+            if max_x >= width:
+                return []
+            return [(y * width + max_x - 1, y * width + max_x) for y in range(min_y, max_y)]
+        if max_y >= self.pathfinder.height:
+            return []
+        return [((max_y - 1) * width + x, max_y * width + x) for x in range(min_x, max_x)]
+
+    def _build_border(self, border: Tuple[int, int, int]) -> bool:
+        """Place transitions on the walkable runs of a border, returns True if they changed"""
+        costs = self.pathfinder.costs
+        transitions = []
+        run: List[Tuple[int, int]] = []
+        for pair in self._border_pairs(border) + [None]:
+            if pair and costs[pair[0]] < IMPASSABLE_COST and costs[pair[1]] < IMPASSABLE_COST:
+                run.append(pair)
+                continue
+            if run:
+                if len(run) > ENTRANCE_SPLIT_LENGTH:
+                    transitions.extend((run[0], run[-1]))
+                else:
+                    transitions.append(run[len(run) // 2])
+                run = []
+
+        old = self.transitions.get(border, [])
+        if transitions == old:
+            return False
+
+        for inside, outside in old:
+            self.crossings.get(inside, set()).discard(outside)
+            self.crossings.get(outside, set()).discard(inside)
+        for inside, outside in transitions:
+            self.crossings.setdefault(inside, set()).add(outside)
+            self.crossings.setdefault(outside, set()).add(inside)
+        self.transitions[border] = transitions
+        return True
+
+    def _cluster_borders(self, cluster: int) -> List[Tuple[int, int, int]]:
+        """Get the (up to) four borders touching a cluster"""
+        cx = cluster % self.clusters_x
+        cy = cluster // self.clusters_x
+        borders = [(cx, cy, EAST), (cx, cy, SOUTH)]
+        if cx > 0:
+            borders.append((cx - 1, cy, EAST))
+        if cy > 0:
+            borders.append((cx, cy - 1, SOUTH))
+        return borders
+
+    def _tile_borders(self, index: int) -> List[Tuple[int, int, int]]:
+        """Get the borders a tile sits on"""
+        width = self.pathfinder.width
+        size = self.cluster_size
+        x = index % width
+        y = index // width
+        cx = x // size
+        cy = y // size
+        borders = []
+        if x % size == size - 1:
+            borders.append((cx, cy, EAST))
+        elif x % size == 0 and cx > 0:
+            borders.append((cx - 1, cy, EAST))
+        if y % size == size - 1:
+            borders.append((cx, cy, SOUTH))
+        elif y % size == 0 and cy > 0:
+            borders.append((cx, cy - 1, SOUTH))
+        return borders
+
+    def _build_cluster(self, cluster: int):
+        """Recompute a cluster's entrances and the in-cluster costs between them"""
+        entrances = set()
+        for border in self._cluster_borders(cluster):
+            for inside, outside in self.transitions.get(border, []):
+                entrances.add(inside if self._cluster_of(inside) == cluster else outside)
+
+        for old in self.entrances.get(cluster, set()) - entrances:
+            self.intra_edges.pop(old, None)
+        self.entrances[cluster] = entrances
+        self.refined[cluster] = {}
+
+        for entrance in entrances:
+            distances, _ = self._cluster_search(entrance, cluster)
+            self.intra_edges[entrance] = {other: distances[other] for other in entrances
+                                          if other != entrance and other in distances}
+        self.clusters_rebuilt += 1
+
+    def refresh(self):
+        """Bring the abstract graph up to date with the pathfinder's cost grid"""
+        pathfinder = self.pathfinder
+        if self.version == pathfinder.cost_version:
+            return
+        self.clusters_rebuilt = 0
+
+        changes = pathfinder.changes_since(self.version) if self.version >= 0 else None
+        if changes is None:
+            # First query (or too many changes to replay): build everything
+            self.transitions = {}
+            self.crossings = {}
+            self.entrances = {}
+            self.intra_edges = {}
+            for cy in range(self.clusters_y):
+                for cx in range(self.clusters_x):
+                    self._build_border((cx, cy, EAST))
+                    self._build_border((cx, cy, SOUTH))
+            dirty = set(range(self.clusters_x * self.clusters_y))
+        else:
+            # Only the changed tiles' clusters, plus neighbors whose shared entrances moved
+            dirty = set()
+            for index in changes:
+                dirty.add(self._cluster_of(index))
+                for border in self._tile_borders(index):
+                    if self._build_border(border):
+                        cx, cy, direction = border
+                        dirty.add(cy * self.clusters_x + cx)
+                        dirty.add((cy + direction) * self.clusters_x + cx + 1 - direction)
+
+        for cluster in dirty:
+            self._build_cluster(cluster)
+        self.version = pathfinder.cost_version
+
+    def _cluster_search(self, source: int, cluster: int, reverse: bool = False,
+                        target: Optional[int] = None) -> Tuple[Dict[int, float], Dict[int, int]]:
+        """
+        Dijkstra restricted to one cluster
+        Forward searches give the cost from source to each tile, reverse searches
+        the cost from each tile to source. Returns (distances, parents).
+        """
+        pathfinder = self.pathfinder
+        costs = pathfinder.costs
+        width = pathfinder.width
+        min_x, min_y, max_x, max_y = self._cluster_bounds(cluster)
+
+        distances = {source: 0}
+        parents = {source: -1}
+        closed = set()
+        open_list = [(0, source)]
+        while open_list:
+            distance, current = heapq.heappop(open_list)
+            if current in closed:
+                continue
+            closed.add(current)
+            self.nodes_expanded += 1
+            if current == target:
+                break
+
+            x = current % width
+            y = current // width
+            for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if not (min_x <= nx < max_x and min_y <= ny < max_y):
+                    continue
+                neighbor = ny * width + nx
+                if costs[neighbor] >= IMPASSABLE_COST or neighbor in closed:
+                    continue
+                self.nodes_evaluated += 1
+                # Forward pays to enter the neighbor, reverse pays to enter current
+                candidate = distance + (costs[current] if reverse else costs[neighbor])
+                if candidate < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = candidate
+                    parents[neighbor] = current
+                    heapq.heappush(open_list, (candidate, neighbor))
+        return distances, parents
+
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Find a near-optimal path from start to goal through the cluster hierarchy
+        Returns list of (x, y) coordinates or None if no path exists
+        """
+        # Counted from before the refresh, so a query that (re)builds clusters reports that work too
+        self.nodes_expanded = 0
+        self.nodes_evaluated = 0
+        self.refresh()
+
+        pathfinder = self.pathfinder
+        costs = pathfinder.costs
+        width = pathfinder.width
+        start_index = start[1] * width + start[0]
+        goal_index = goal[1] * width + goal[0]
+        if start_index == goal_index:
+            return [start]
+        start_cluster = self._cluster_of(start_index)
+        goal_cluster = self._cluster_of(goal_index)
+
+        # Temporarily connect start and goal to the entrances of their clusters
+        start_distances, start_parents = self._cluster_search(start_index, start_cluster)
+        goal_distances, goal_parents = self._cluster_search(goal_index, goal_cluster, reverse=True)
+
+        # A* over the abstract graph of entrances
+        goal_x, goal_y = goal
+        g_scores = {start_index: 0}
+        came_from = {start_index: -1}
+        closed = set()
+        open_list = [(0, start_index)]
+        found = False
+        while open_list:
+            _, current = heapq.heappop(open_list)
+            if current in closed:
+                continue
+            closed.add(current)
+            self.nodes_expanded += 1
+            if current == goal_index:
+                found = True
+                break
+
+            if current == start_index:
+                edges = {entrance: start_distances[entrance]
+                         for entrance in self.entrances.get(start_cluster, ())
+                         if entrance in start_distances and entrance != start_index}
+                if start_cluster == goal_cluster and goal_index in start_distances:
+                    edges[goal_index] = start_distances[goal_index]
+            else:
+                edges = dict(self.intra_edges.get(current, {}))
+                if self._cluster_of(current) == goal_cluster and current in goal_distances:
+                    edges[goal_index] = goal_distances[current]
+            for across in self.crossings.get(current, ()):
+                edges[across] = costs[across]
+
+            current_g = g_scores[current]
+            for neighbor, cost in edges.items():
+                if neighbor in closed:
+                    continue
+                self.nodes_evaluated += 1
+                tentative_g = current_g + cost
+                if tentative_g < g_scores.get(neighbor, float('inf')):
+                    g_scores[neighbor] = tentative_g
+                    came_from[neighbor] = current
+                    h = abs(neighbor % width - goal_x) + abs(neighbor // width - goal_y)
+                    heapq.heappush(open_list, (tentative_g + h, neighbor))
+
+        if not found:
+            return None
+
+        abstract = []
+        node = goal_index
+        while node != -1:
+            abstract.append(node)
+            node = came_from[node]
+        abstract.reverse()
+
+        # Refine each abstract edge into tiles
+        tiles = [start_index]
+        for u, v in zip(abstract, abstract[1:]):
+            if v in self.crossings.get(u, ()):
+                tiles.append(v)
+            elif u == start_index:
+                tiles.extend(self._trace_forward(start_parents, v))
+            elif v == goal_index and u in goal_distances:
+                tiles.extend(self._trace_reverse(goal_parents, u))
+            else:
+                tiles.extend(self._refine_edge(u, v))
+        return [(index % width, index // width) for index in tiles]
+
+    def _trace_forward(self, parents: Dict[int, int], end: int) -> List[int]:
+        """Tiles after the source of a forward search up to and including end"""
+        route = []
+        while parents[end] != -1:
+            route.append(end)
+            end = parents[end]
+        route.reverse()
+        return route
+
+    def _trace_reverse(self, parents: Dict[int, int], begin: int) -> List[int]:
+        """Tiles after begin up to and including the source of a reverse search"""
+        route = []
+        while parents[begin] != -1:
+            begin = parents[begin]
+            route.append(begin)
+        return route
+
+    def _refine_edge(self, u: int, v: int) -> List[int]:
+        """Tiles of the in-cluster route from entrance u to entrance v, cached per cluster"""
+        cluster = self._cluster_of(u)
+        cache = self.refined.setdefault(cluster, {})
+        if (u, v) not in cache:
+            _, parents = self._cluster_search(u, cluster, target=v)
+            cache[(u, v)] = self._trace_forward(parents, v)
+        return cache[(u, v)]
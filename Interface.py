@@ -4,7 +4,7 @@ from typing import List, Tuple, Optional, Dict, Any
 
 # Import necessary classes from other modules
 from Config import Config
-from MapGen import Tile, MapGenerator
+from MapGen import TileGrid, MapGenerator, TERRAIN_TYPES
 from Pathfinding import Pathfinder
 from Enemy import Enemy
 from Tower import Tower, Projectile, Explosion
@@ -19,13 +19,17 @@ class InterfaceRenderer:
         self.fonts = fonts
         self.asset_loader = asset_loader
     
-    def render_map(self, tiles: Dict[Tuple[int, int], Tile], map_width: int, map_height: int, 
+    def render_map(self, tiles: TileGrid, map_width: int, map_height: int, 
                    offset_x: int = 0, offset_y: int = 0):
         """Render the game map tiles"""
+        # Read terrain codes and barricade bits straight from the map grids
+        map_gen = tiles.map_gen
+        codes = map_gen.terrain
         for y in range(map_height):
             for x in range(map_width):
                 if (x, y) in tiles:
-                    tile = tiles[(x, y)]
+                    terrain = TERRAIN_TYPES[codes[y * map_gen.width + x]]
+                    has_barricade = map_gen.has_barricade(x, y)
                     rect = pygame.Rect(
                         x * Config.TILE_SIZE + offset_x,
                         y * Config.TILE_SIZE + offset_y,
@@ -34,18 +38,18 @@ class InterfaceRenderer:
                     )
                     
                     # Try to load SVG sprite first
-                    sprite = self.asset_loader.get_tile_sprite(tile.terrain, Config.TILE_SIZE)
+                    sprite = self.asset_loader.get_tile_sprite(terrain, Config.TILE_SIZE)
                     
                     if sprite:
                         # Render tile sprite
                         self.screen.blit(sprite, rect.topleft)
                     else:
                         # Fallback to current rectangle rendering
-                        color = tile.get_color()
+                        color = tiles[(x, y)].get_color()
                         pygame.draw.rect(self.screen, color, rect)
                     
                     # Render barricade
-                    if tile.has_barricade:
+                    if has_barricade:
                         barricade_sprite = self.asset_loader.get_barricade_sprite(Config.TILE_SIZE)
                         if barricade_sprite:
                             self.screen.blit(barricade_sprite, rect.topleft)
@@ -211,6 +215,19 @@ class InterfaceRenderer:
             text = self.fonts['tiny'].render(instruction, True, Config.COLOR_UI_TEXT)
             self.screen.blit(text, (panel_x, panel_y + i * 18))
     
+    def render_barricade_preview(self, panel_x: int, panel_y: int, cost_increase: float, chokepoint: bool):
+        """Render how a barricade on the hovered tile would change the enemy routes"""
+        if cost_increase > 0:
+            message = f"Barricade here: route cost +{int(cost_increase)}"
+        else:
+            message = "Barricade here: routes unaffected"
+        text = self.fonts['small'].render(message, True, Config.COLOR_UI_TEXT)
+        self.screen.blit(text, (panel_x, panel_y))
+        
+        if chokepoint:
+            chokepoint_text = self.fonts['tiny'].render("Chokepoint: every route passes here", True, (255, 200, 0))
+            self.screen.blit(chokepoint_text, (panel_x, panel_y + 18))
+    
     def render_alerts(self, alerts: List[str]):
         """Render alert messages"""
         alert_y = Config.WINDOW_HEIGHT // 2 - 100
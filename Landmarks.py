@@ -0,0 +1,118 @@
+# Handles landmark (ALT) distance tables used to tighten the A* heuristic
+import heapq
+from array import array
+from typing import List, Optional, Callable
+
+# Import the impassable cost threshold from the flat pathfinder
+from Pathfinding import IMPASSABLE_COST
+
+
+class LandmarkHeuristic:
+    """
+    ALT heuristic: A*, landmarks and the triangle inequality
+
+    A few spread-out landmark tiles each keep a table of the cheapest cost from
+    the landmark to every tile. For any tile u and goal g the triangle
+    inequality then gives a lower bound on the cost from u to g that is far
+    tighter than Manhattan distance once terrain costs vary. Tables are rebuilt
+    lazily, on the first query after the cost grid changed.
+    """
+    def __init__(self, pathfinder, count: int):
+        self.pathfinder = pathfinder
+        self.count = count
+        self.landmarks: List[int] = []  # Flat indices of the landmark tiles
+        self.tables: List[array] = []  # Cost from each landmark to every tile
+        self.version = -1  # cost_version the tables were built against (-1 = never built)
+
+        # Performance metrics
+        self.rebuilds = 0  # Number of times the tables were recomputed
+
+    def _distances_from(self, source: int) -> array:
+        """Dijkstra from one tile over the whole grid, returns the cost to enter every tile"""
+        pathfinder = self.pathfinder
+        costs = pathfinder.costs
+        distances = array('d', [float('inf')]) * len(costs)
+        distances[source] = 0
+        open_list = [(0, source)]
+        while open_list:
+            distance, current = heapq.heappop(open_list)
+            if distance > distances[current]:
+                continue
+            for neighbor in pathfinder._neighbor_indices(current):
+                cost = costs[neighbor]
+                if cost >= IMPASSABLE_COST:
+                    continue
+                candidate = distance + cost
+                if candidate < distances[neighbor]:
+                    distances[neighbor] = candidate
+                    heapq.heappush(open_list, (candidate, neighbor))
+        return distances
+
+    def _select_landmarks(self):
+        """Pick landmarks by farthest-point selection, starting from the walkable tile nearest (0, 0)"""
+        costs = self.pathfinder.costs
+        self.landmarks = []
+        self.tables = []
+        first = next((index for index in range(len(costs)) if costs[index] < IMPASSABLE_COST), None)
+        if first is None:
+            return
+
+        # Cost to the nearest chosen landmark, the next landmark maximizes it
+        nearest = array('d', [float('inf')]) * len(costs)
+        candidate = first
+        while candidate is not None and len(self.landmarks) < self.count:
+            table = self._distances_from(candidate)
+            self.landmarks.append(candidate)
+            self.tables.append(table)
+            for index, distance in enumerate(table):
+                if distance < nearest[index]:
+                    nearest[index] = distance
+
+            candidate = None
+            farthest = 0
+            for index, distance in enumerate(nearest):
+                if farthest < distance < float('inf'):
+                    farthest = distance
+                    candidate = index
+
+    def refresh(self):
+        """Rebuild the distance tables if the cost grid changed since they were built"""
+        pathfinder = self.pathfinder
+        if self.version == pathfinder.cost_version:
+            return
+        costs = pathfinder.costs
+        if not self.landmarks or any(costs[landmark] >= IMPASSABLE_COST for landmark in self.landmarks):
+            self._select_landmarks()
+        else:
+            self.tables = [self._distances_from(landmark) for landmark in self.landmarks]
+        self.version = pathfinder.cost_version
+        self.rebuilds += 1
+
+    def heuristic_for(self, goal_index: int) -> Optional[Callable[[int], float]]:
+        """
+        Build a lower bound on the cost from any tile to the goal
+        Returns None if no landmark can bound the goal
+        """
+        self.refresh()
+        costs = self.pathfinder.costs
+        goal_cost = costs[goal_index]
+
+        # Only landmarks that can reach the goal give finite bounds
+        bounds = [(table, table[goal_index]) for table in self.tables if table[goal_index] != float('inf')]
+        if not bounds:
+            return None
+
+        def estimate(index: int) -> float:
+            best = 0
+            for table, to_goal in bounds:
+                delta = table[index] - to_goal
+                if delta == float('inf'):
+                    continue
+                # d(L, u) + d(u, g) >= d(L, g), and d(u, L) <= d(u, g) + d(g, L) where
+                # reversing a route from L only swaps which endpoint's cost is paid
+                bound = max(-delta, delta + goal_cost - costs[index])
+                if bound > best:
+                    best = bound
+            return best
+
+        return estimate
@@ -1,30 +1,113 @@
 # Handles terrain generation, START/END points, and tile properties
 import pygame
 import random
+import struct
+from array import array
 from collections import deque
-from typing import List, Tuple
+from collections.abc import Mapping
+from typing import List, Tuple, Iterator, Optional
+
+# NumPy is optional, without it clusters always grow tile by tile
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 # Import Config from Config module
 from Config import Config
 
 
+# Terrain types in the order of their one-byte codes in MapGenerator.terrain
+TERRAIN_TYPES = ('grass', 'road', 'forest', 'swamp', 'stone')
+TERRAIN_CODES = {terrain: code for code, terrain in enumerate(TERRAIN_TYPES)}
+
+# Bump whenever a change makes a seed generate a different map, so maps stored by older versions are not reused
+GENERATOR_VERSION = 1
+
+# Binary map format: header, START points then the END point as (x, y) pairs, then one terrain code per tile
+MAP_FILE_MAGIC = b'ATDM'
+MAP_FORMAT_VERSION = 1
+MAP_HEADER = struct.Struct('<4sBBBxHHQH')  # magic, format, generator version, flags, width, height, seed, START count
+MAP_POINT = struct.Struct('<HH')
+MAP_FLAG_VECTORIZED = 1  # Clusters were grown by the NumPy generator
+SEED_RANGE = 2 ** 64  # Seeds are stored as unsigned 64-bit integers, any other seed is reduced into this range
+
+# Terrain clusters, grown in this order so later types take precedence where they are allowed:
+# (terrain, cluster count range, cluster size range, growth probability, terrain it may grow on)
+CLUSTER_TYPES = [
+    ('forest', (6, 7), (12, 20), 0.6, None),  # 6-7 clusters, larger size
+    ('swamp', (5, 6), (10, 18), 0.6, ['grass', 'forest']),  # Swamp only on grass/forest
+    ('stone', (4, 5), (15, 30), 0.7, None),  # MUCH LARGER mountains, higher growth
+]
+
+
+def vectorized_clusters() -> bool:
+    """True if new maps grow their clusters with NumPy, which generates different maps for the same seed"""
+    return Config.VECTORIZED_CLUSTERS and numpy is not None
+
+
 class MapGenerator:
-    """Generate realistic clustered terrain with continuous road paths"""
+    """
+    Generate realistic clustered terrain with continuous road paths
+
+    The map is stored as one byte of terrain code per tile plus one bit per
+    tile for barricades, row by row. Tiles, costs and rendering all read
+    these two grids, so there is no per-tile object to keep in sync.
     
-    def __init__(self, width: int, height: int):
+    All randomness comes from a private generator seeded with the map's seed,
+    so the same seed, size and generator version always give the same map.
+    Seeds outside 0 to 2**64 - 1 are reduced modulo 2**64 so every map can be stored.
+    """
+    
+    def __init__(self, width: int, height: int, seed: Optional[int] = None, generate: bool = True):
         self.width = width
         self.height = height
-        self.tiles = {}
+        self.seed = (seed if seed is not None else random.getrandbits(32)) % SEED_RANGE
+        self.rng = random.Random(self.seed)
+        self.generator_version = GENERATOR_VERSION
+        self.vectorized = vectorized_clusters()
         self.start_points: List[Tuple[int, int]] = []
         self.end_point: Tuple[int, int] = (width - 1, height - 1)
-        self._generate()
+        self.terrain = bytearray(width * height)  # One TERRAIN_TYPES code per tile, row by row
+        self.barricades = bytearray((width * height + 7) // 8)  # One bit per tile, set where a barricade stands
+        if generate:
+            self._generate()
+    
+    def to_bytes(self) -> bytes:
+        """Pack the map into the binary map format (barricades are not saved)"""
+        header = MAP_HEADER.pack(MAP_FILE_MAGIC, MAP_FORMAT_VERSION, self.generator_version,
+                                 MAP_FLAG_VECTORIZED if self.vectorized else 0,
+                                 self.width, self.height, self.seed, len(self.start_points))
+        points = b''.join(MAP_POINT.pack(x, y) for x, y in self.start_points + [self.end_point])
+        return header + points + bytes(self.terrain)
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'MapGenerator':
+        """Rebuild a map from the binary map format without generating it again"""
+        if len(data) < MAP_HEADER.size:
+            raise ValueError("Map data is too short")
+        magic, format_version, generator_version, flags, width, height, seed, num_starts = MAP_HEADER.unpack_from(data)
+        if magic != MAP_FILE_MAGIC or format_version != MAP_FORMAT_VERSION:
+            raise ValueError("Not a map in a supported format")
+        
+        offset = MAP_HEADER.size
+        terrain_offset = offset + (num_starts + 1) * MAP_POINT.size
+        if len(data) != terrain_offset + width * height:
+            raise ValueError("Map data does not match its header")
+        points = [MAP_POINT.unpack_from(data, offset + i * MAP_POINT.size) for i in range(num_starts + 1)]
+        
+        map_gen = cls(width, height, seed, generate=False)
+        map_gen.generator_version = generator_version
+        map_gen.vectorized = bool(flags & MAP_FLAG_VECTORIZED)
+        map_gen.start_points = points[:-1]
+        map_gen.end_point = points[-1]
+        map_gen.terrain[:] = data[terrain_offset:]
+        return map_gen
     
     def _generate(self):
         """Generate complete map"""
-        # Initialize with grass
-        for y in range(self.height):
-            for x in range(self.width):
-                self.tiles[(x, y)] = 'grass'
+        # Initialize with grass (code 0)
+        self.terrain[:] = bytes(self.width * self.height)
         
         # Generate clustered terrain FIRST (forest, swamp, stone) - MORE FREQUENT & LARGER
         self._generate_clusters()
@@ -36,11 +119,11 @@ class MapGenerator:
         self._generate_road_paths()
         
         # Ensure end is road, START can stay as terrain or become road
-        self.tiles[self.end_point] = 'road'
+        self._set_tile(self.end_point[0], self.end_point[1], 'road')
         for start_x, start_y in self.start_points:
-            terrain = self.tiles[(start_x, start_y)]
+            terrain = self.get_tile(start_x, start_y)
             if terrain == 'grass':
-                self.tiles[(start_x, start_y)] = 'road'
+                self._set_tile(start_x, start_y, 'road')
             # If forest, keep as forest (enemy can spawn on forest)
     
     def _is_border_tile(self, x: int, y: int) -> bool:
@@ -53,28 +136,99 @@ class MapGenerator:
     
     def _generate_clusters(self):
         """Generate clustered terrain - MORE FREQUENT and LARGER"""
-        # FOREST clusters - (6-7 clusters, larger size)
-        num_forest_clusters = random.randint(6, 7)
-        for _ in range(num_forest_clusters):
-            cx = random.randint(2, self.width - 3)
-            cy = random.randint(2, self.height - 3)
-            self._grow_cluster(cx, cy, 'forest', size=random.randint(12, 20))
+        if self.vectorized:
+            self._generate_clusters_vectorized()
+            return
         
-        # SWAMP clusters - (5-6 clusters, larger size)
-        num_swamp_clusters = random.randint(5, 6)
-        for _ in range(num_swamp_clusters):
-            cx = random.randint(2, self.width - 3)
-            cy = random.randint(2, self.height - 3)
-            self._grow_cluster(cx, cy, 'swamp', size=random.randint(10, 18), 
-                             allow_terrain=['grass', 'forest'])  # Swamp only on grass/forest
+        for terrain, counts, sizes, growth_probability, allow_terrain in CLUSTER_TYPES:
+            num_clusters = self.rng.randint(*counts)
+            for _ in range(num_clusters):
+                cx = self.rng.randint(2, self.width - 3)
+                cy = self.rng.randint(2, self.height - 3)
+                self._grow_cluster(cx, cy, terrain, size=self.rng.randint(*sizes),
+                                   growth_probability=growth_probability, allow_terrain=allow_terrain)
+    
+    def _generate_clusters_vectorized(self):
+        """
+        Grow every cluster of a terrain type at once with NumPy
+        Each step, the tiles a cluster gained last step try to spread to their
+        neighbors, like _grow_cluster's queue but one whole ring per step
+        """
+        width = self.width
+        terrain_grid = numpy.frombuffer(self.terrain, dtype=numpy.uint8)  # Writes go straight into self.terrain
+        size = width * self.height
+        # Seeded from the map's RNG, so the seed still decides the whole map
+        rng = numpy.random.default_rng(self.rng.getrandbits(64))
         
-        # STONE mountains - MUCH LARGER (4-5 clusters, 15-30 size)
-        num_stone_clusters = random.randint(4, 5)
-        for _ in range(num_stone_clusters):
-            cx = random.randint(2, self.width - 3)
-            cy = random.randint(2, self.height - 3)
-            self._grow_cluster(cx, cy, 'stone', size=random.randint(15, 30), 
-                             growth_probability=0.7)  # Higher growth for bigger mountains
+        for terrain, counts, sizes, growth_probability, allow_terrain in CLUSTER_TYPES:
+            num_clusters = self.rng.randint(*counts)
+            seeds = []
+            remaining = []
+            for _ in range(num_clusters):
+                cx = self.rng.randint(2, self.width - 3)
+                cy = self.rng.randint(2, self.height - 3)
+                seeds.append(cy * width + cx)
+                remaining.append(self.rng.randint(*sizes))
+            
+            if allow_terrain is None:
+                allow_terrain = ['grass', 'forest', 'swamp']
+            allowed = numpy.zeros(256, dtype=bool)
+            allowed[[TERRAIN_CODES[name] for name in allow_terrain]] = True
+            code = TERRAIN_CODES[terrain]
+            
+            # Cluster label per tile (-1 = free), and how many more tiles each cluster may take
+            labels = numpy.full(size, -1, dtype=numpy.int32)
+            claims = numpy.zeros(size, dtype=numpy.int64)  # Scratch space to keep one spread per tile
+            remaining = numpy.array(remaining, dtype=numpy.int64)
+            ring = numpy.array(seeds, dtype=numpy.int64)
+            ring_labels = numpy.arange(num_clusters, dtype=numpy.int32)
+            
+            while ring.size:
+                # A seed or a spread only takes hold on allowed terrain not already in a cluster
+                keep = allowed[terrain_grid[ring]] & (labels[ring] == -1)
+                ring = ring[keep]
+                ring_labels = ring_labels[keep]
+                
+                # Tiles reached more than once this step go to a single one of the spreads
+                entries = numpy.arange(ring.size)
+                claims[ring] = entries
+                keep = claims[ring] == entries
+                ring = ring[keep]
+                ring_labels = ring_labels[keep]
+                
+                # Clusters that would outgrow their size keep a random subset of the new ring
+                gained = numpy.bincount(ring_labels, minlength=num_clusters)
+                if (gained > remaining).any():
+                    order = rng.permutation(ring.size)
+                    order = order[numpy.argsort(ring_labels[order], kind='stable')]
+                    ring = ring[order]
+                    ring_labels = ring_labels[order]
+                    rank = numpy.arange(ring.size) - numpy.searchsorted(ring_labels, ring_labels)
+                    keep = rank < remaining[ring_labels]
+                    ring = ring[keep]
+                    ring_labels = ring_labels[keep]
+                    gained = numpy.bincount(ring_labels, minlength=num_clusters)
+                
+                labels[ring] = ring_labels
+                terrain_grid[ring] = code
+                remaining -= gained
+                
+                # Every new tile tries each in-bounds neighbor with the growth probability
+                x = ring % width
+                spread = []
+                spread_labels = []
+                for offset, inside in ((-1, x > 0), (1, x < width - 1),
+                                       (-width, ring >= width), (width, ring < size - width)):
+                    tries = inside & (rng.random(ring.size) < growth_probability)
+                    spread.append(ring[tries] + offset)
+                    spread_labels.append(ring_labels[tries])
+                ring = numpy.concatenate(spread)
+                ring_labels = numpy.concatenate(spread_labels)
+                
+                # Finished clusters stop spreading
+                active = remaining[ring_labels] > 0
+                ring = ring[active]
+                ring_labels = ring_labels[active]
     
     def _grow_cluster(self, start_x: int, start_y: int, terrain: str, size: int,
                       growth_probability: float = 0.6, allow_terrain: List[str] = None):
@@ -86,25 +240,27 @@ class MapGenerator:
         
         if allow_terrain is None:
             allow_terrain = ['grass', 'forest', 'swamp']  # Default: can grow on these
+        allowed_codes = {TERRAIN_CODES[allowed] for allowed in allow_terrain}
+        code = TERRAIN_CODES[terrain]
         
         while queue and cluster_size < size:
             x, y = queue.popleft()
             
             # Only place if within bounds
             if 0 <= x < self.width and 0 <= y < self.height:
-                current_terrain = self.tiles[(x, y)]
+                index = y * self.width + x
                 
                 # Check if can place this terrain
-                if current_terrain not in allow_terrain:
+                if self.terrain[index] not in allowed_codes:
                     continue
                 
-                self.tiles[(x, y)] = terrain
+                self.terrain[index] = code
                 cluster_size += 1
                 
                 # Add neighbors with probability (creates organic shape)
                 for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
                     nx, ny = x + dx, y + dy
-                    if (nx, ny) not in visited and random.random() < growth_probability:
+                    if (nx, ny) not in visited and self.rng.random() < growth_probability:
                         visited.add((nx, ny))
                         queue.append((nx, ny))
     
@@ -116,7 +272,7 @@ class MapGenerator:
         for x in range(self.width):
             for y in range(self.height):
                 if self._is_border_tile(x, y):
-                    terrain = self.tiles[(x, y)]
+                    terrain = self.get_tile(x, y)
                     # Only allow GRASS or FOREST
                     if terrain in ['grass', 'forest']:
                         distance = self._manhattan_distance(x, y, self.end_point[0], self.end_point[1])
@@ -125,7 +281,7 @@ class MapGenerator:
         
         # Randomly select 3 start points
         if len(border_tiles) >= Config.NUM_START_POINTS:
-            self.start_points = random.sample(border_tiles, Config.NUM_START_POINTS)
+            self.start_points = self.rng.sample(border_tiles, Config.NUM_START_POINTS)
         else:
             # If not enough valid border tiles, just pick as many as possible
             self.start_points = border_tiles[:Config.NUM_START_POINTS]
@@ -143,9 +299,9 @@ class MapGenerator:
             # Place main road on map
             for x, y in main_path:
                 if 0 <= x < self.width and 0 <= y < self.height:
-                    current_terrain = self.tiles[(x, y)]
+                    current_terrain = self.get_tile(x, y)
                     if current_terrain in ['grass', 'forest', 'road']:
-                        self.tiles[(x, y)] = 'road'
+                        self._set_tile(x, y, 'road')
             
             # For remaining START points, create paths that prefer to merge with existing roads
             for start_x, start_y in self.start_points[1:]:
@@ -154,40 +310,51 @@ class MapGenerator:
                 # Place road on map
                 for x, y in path:
                     if 0 <= x < self.width and 0 <= y < self.height:
-                        current_terrain = self.tiles[(x, y)]
+                        current_terrain = self.get_tile(x, y)
                         if current_terrain in ['grass', 'forest', 'road']:
-                            self.tiles[(x, y)] = 'road'
+                            self._set_tile(x, y, 'road')
+    
+    def _trace_road_path(self, parents: array, index: int) -> List[Tuple[int, int]]:
+        """Walk the BFS parent pointers back from a tile, returns the path from the search start"""
+        path = []
+        while index != -1:
+            path.append((index % self.width, index // self.width))
+            index = parents[index]
+        path.reverse()
+        return path
     
     def _find_converging_road_path(self, start_x: int, start_y: int) -> List[Tuple[int, int]]:
         """Find path that converges with existing roads"""
-        visited = set()
-        queue = deque([(start_x, start_y, [])])
-        visited.add((start_x, start_y))
+        # Each queued tile remembers only the tile it was reached from, the path is traced at the end
+        width = self.width
+        parents = array('i', [-1]) * (width * self.height)
+        visited = bytearray(width * self.height)
+        queue = deque([(start_x, start_y)])
+        visited[start_y * width + start_x] = 1
         
         max_iterations = self.width * self.height * 2
         iterations = 0
         
         while queue and iterations < max_iterations:
-            x, y, path = queue.popleft()
+            x, y = queue.popleft()
             iterations += 1
-            path = path + [(x, y)]
             
             # Check if we hit an existing road (convergence point)
-            if self.tiles.get((x, y)) == 'road' and len(path) > 1:
-                return path
+            if self.terrain[y * width + x] == TERRAIN_CODES['road'] and (x, y) != (start_x, start_y):
+                return self._trace_road_path(parents, y * width + x)
             
             # Check if reached end
             if x == self.end_point[0] and y == self.end_point[1]:
-                return path
+                return self._trace_road_path(parents, y * width + x)
             
             # Get neighbors with strong preference for existing roads
             neighbors = []
             for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
                 nx, ny = x + dx, y + dy
                 if (0 <= nx < self.width and 0 <= ny < self.height and 
-                    (nx, ny) not in visited):
+                    not visited[ny * width + nx]):
                     
-                    terrain = self.tiles.get((nx, ny), 'stone')
+                    terrain = TERRAIN_TYPES[self.terrain[ny * width + nx]]
                     
                     # Calculate preference with STRONG bias toward existing roads
                     if terrain == 'road':
@@ -211,42 +378,45 @@ class MapGenerator:
             if neighbors:
                 neighbors.sort()
                 for _, nx, ny in neighbors:
-                    if (nx, ny) not in visited:
-                        visited.add((nx, ny))
-                        queue.append((nx, ny, path))
+                    if not visited[ny * width + nx]:
+                        visited[ny * width + nx] = 1
+                        parents[ny * width + nx] = y * width + x
+                        queue.append((nx, ny))
         
         # If no path found, return partial
         return [(start_x, start_y)]
     
     def _find_road_path(self, start_x: int, start_y: int, end_x: int, end_y: int) -> List[Tuple[int, int]]:
         """Find CURVED path with randomized decisions"""
-        visited = set()
-        queue = deque([(start_x, start_y, [])])
-        visited.add((start_x, start_y))
+        # Each queued tile remembers only the tile it was reached from, the path is traced at the end
+        width = self.width
+        parents = array('i', [-1]) * (width * self.height)
+        visited = bytearray(width * self.height)
+        queue = deque([(start_x, start_y)])
+        visited[start_y * width + start_x] = 1
         
         max_iterations = self.width * self.height * 3
         iterations = 0
         
         # Random direction bias for curved roads
-        direction_bias = random.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])
+        direction_bias = self.rng.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])
         
         while queue and iterations < max_iterations:
-            x, y, path = queue.popleft()
+            x, y = queue.popleft()
             iterations += 1
-            path = path + [(x, y)]
             
             # Check if reached end
             if x == end_x and y == end_y:
-                return path
+                return self._trace_road_path(parents, y * width + x)
             
             # Get neighbors with RANDOMIZED preference (for curved roads)
             neighbors = []
             for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
                 nx, ny = x + dx, y + dy
                 if (0 <= nx < self.width and 0 <= ny < self.height and 
-                    (nx, ny) not in visited):
+                    not visited[ny * width + nx]):
                     
-                    terrain = self.tiles[(nx, ny)]
+                    terrain = TERRAIN_TYPES[self.terrain[ny * width + nx]]
                     
                     # Calculate preference
                     if terrain == 'grass':
@@ -268,20 +438,22 @@ class MapGenerator:
             
             # RANDOMIZED path selection: 30% chance to pick random neighbor
             if neighbors:
-                if random.random() < 0.3:
+                if self.rng.random() < 0.3:
                     # Random choice - creates twists and turns
-                    neighbor = random.choice(neighbors)
+                    neighbor = self.rng.choice(neighbors)
                     _, nx, ny = neighbor
-                    if (nx, ny) not in visited:
-                        visited.add((nx, ny))
-                        queue.append((nx, ny, path))
+                    if not visited[ny * width + nx]:
+                        visited[ny * width + nx] = 1
+                        parents[ny * width + nx] = y * width + x
+                        queue.append((nx, ny))
                 else:
                     # Optimal choice - sorted by preference
                     neighbors.sort()
                     for _, nx, ny in neighbors:
-                        if (nx, ny) not in visited:
-                            visited.add((nx, ny))
-                            queue.append((nx, ny, path))
+                        if not visited[ny * width + nx]:
+                            visited[ny * width + nx] = 1
+                            parents[ny * width + nx] = y * width + x
+                            queue.append((nx, ny))
         
         # If no path found, return partial
         return [(start_x, start_y)]
@@ -289,24 +461,65 @@ class MapGenerator:
     def get_tile(self, x: int, y: int) -> str:
         """Get terrain at position"""
         if 0 <= x < self.width and 0 <= y < self.height:
-            return self.tiles.get((x, y), 'grass')
+            return TERRAIN_TYPES[self.terrain[y * self.width + x]]
         return 'stone'
+    
+    def _set_tile(self, x: int, y: int, terrain: str):
+        """Set terrain at position"""
+        self.terrain[y * self.width + x] = TERRAIN_CODES[terrain]
+    
+    def has_barricade(self, x: int, y: int) -> bool:
+        """Check if a barricade stands on a tile"""
+        index = y * self.width + x
+        return bool(self.barricades[index >> 3] & (1 << (index & 7)))
+    
+    def set_barricade(self, x: int, y: int, barricade: bool):
+        """Place or remove the barricade on a tile"""
+        index = y * self.width + x
+        if barricade:
+            self.barricades[index >> 3] |= 1 << (index & 7)
+        else:
+            self.barricades[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+    
+    def get_cost(self, x: int, y: int) -> int:
+        """Get movement cost of a tile, barricade included"""
+        cost = Config.TERRAIN_COSTS.get(self.get_tile(x, y), 1)
+        if self.has_barricade(x, y):
+            return cost + Config.BARRICADE_COST
+        return cost
 
 
 class Tile:
-    """Map tile"""
-    def __init__(self, x: int, y: int, terrain: str):
+    """Map tile, a view that reads and writes the MapGenerator's terrain and barricade grids"""
+    __slots__ = ('map_gen', 'x', 'y')
+    
+    def __init__(self, map_gen: MapGenerator, x: int, y: int):
+        self.map_gen = map_gen
         self.x = x
         self.y = y
-        self.terrain = terrain
-        self.has_barricade = False
-        self.base_cost = Config.TERRAIN_COSTS.get(terrain, 1)
+    
+    @property
+    def terrain(self) -> str:
+        """Terrain type of the tile"""
+        return self.map_gen.get_tile(self.x, self.y)
+    
+    @property
+    def base_cost(self) -> int:
+        """Movement cost of the terrain alone"""
+        return Config.TERRAIN_COSTS.get(self.terrain, 1)
+    
+    @property
+    def has_barricade(self) -> bool:
+        """True if a barricade stands on the tile"""
+        return self.map_gen.has_barricade(self.x, self.y)
+    
+    @has_barricade.setter
+    def has_barricade(self, barricade: bool):
+        self.map_gen.set_barricade(self.x, self.y, barricade)
     
     def get_cost(self) -> int:
         """Get movement cost"""
-        if self.has_barricade:
-            return self.base_cost + Config.BARRICADE_COST
-        return self.base_cost
+        return self.map_gen.get_cost(self.x, self.y)
     
     def get_color(self) -> Tuple[int, int, int]:
         """Get tile color"""
@@ -314,3 +527,29 @@ class Tile:
         if self.has_barricade:
             return tuple(int(c * 0.5) for c in color)
         return color
+
+
+class TileGrid(Mapping):
+    """
+    Read-only (x, y) -> Tile mapping over a MapGenerator
+    Tiles are made on demand as views, so the map keeps no per-tile objects
+    """
+    def __init__(self, map_gen: MapGenerator):
+        self.map_gen = map_gen
+    
+    def __getitem__(self, position: Tuple[int, int]) -> Tile:
+        if position not in self:
+            raise KeyError(position)
+        return Tile(self.map_gen, position[0], position[1])
+    
+    def __contains__(self, position) -> bool:
+        x, y = position
+        return 0 <= x < self.map_gen.width and 0 <= y < self.map_gen.height
+    
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        for y in range(self.map_gen.height):
+            for x in range(self.map_gen.width):
+                yield (x, y)
+    
+    def __len__(self) -> int:
+        return self.map_gen.width * self.map_gen.height
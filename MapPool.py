@@ -0,0 +1,124 @@
+# Handles the on-disk pool of pregenerated maps, so starting a game loads a file instead of generating
+"""
+Usage:
+    python MapPool.py --count 32      Pregenerate maps until the pool holds 32 for the configured map size
+"""
+import argparse
+import os
+import random
+import re
+from typing import List, Set
+
+# Import Config and the map generator from other modules
+from Config import Config
+from MapGen import MapGenerator, GENERATOR_VERSION, SEED_RANGE, vectorized_clusters
+
+
+class MapPool:
+    """
+    Directory of maps in the binary map format, keyed by (seed, size, generator version)
+
+    A map's file name carries everything that decides its terrain, so a file
+    is only ever reused by a generator that would have made the same map.
+    Missing or unreadable files are generated and stored on the way.
+    """
+    def __init__(self, directory: str = Config.MAP_POOL_DIR):
+        if not os.path.isabs(directory):
+            directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), directory)
+        self.directory = directory
+        self.played: Set[int] = set()  # Seeds handed out by next_map this session
+        self.rng = random.Random()  # Own generator, next_map runs on the preloader thread
+
+        # Performance metrics
+        self.loads = 0  # Maps read from disk
+        self.generations = 0  # Maps generated because no usable file existed
+
+    @staticmethod
+    def _version_tag() -> str:
+        """Generator version part of a file name, the NumPy cluster generator makes different maps"""
+        return f"v{GENERATOR_VERSION}{'n' if vectorized_clusters() else ''}"
+
+    def path_for(self, seed: int, width: int, height: int) -> str:
+        """File a map is stored in"""
+        return os.path.join(self.directory, f"map_{width}x{height}_{self._version_tag()}_{seed}.bin")
+
+    def seeds(self, width: int, height: int) -> List[int]:
+        """Seeds of every stored map of this size from the current generator version"""
+        if not os.path.isdir(self.directory):
+            return []
+        pattern = re.compile(rf"map_{width}x{height}_{self._version_tag()}_(\d+)\.bin$")
+        seeds = []
+        for name in os.listdir(self.directory):
+            match = pattern.match(name)
+            if match:
+                seeds.append(int(match.group(1)))
+        return sorted(seeds)
+
+    def store(self, map_gen: MapGenerator):
+        """Write a map to the pool; a pool that cannot be written to only costs the caching"""
+        path = self.path_for(map_gen.seed, map_gen.width, map_gen.height)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write to a temporary file first so a crash never leaves a half-written map behind
+            temporary = f"{path}.tmp"
+            with open(temporary, 'wb') as map_file:
+                map_file.write(map_gen.to_bytes())
+            os.replace(temporary, path)
+        except OSError as error:
+            print(f"Could not store map in pool: {error}")
+
+    def get(self, seed: int, width: int, height: int) -> MapGenerator:
+        """Load the map for a seed, generating and storing it first if the pool does not have it"""
+        seed %= SEED_RANGE  # The seed the map is stored under, as MapGenerator reduces it
+        path = self.path_for(seed, width, height)
+        try:
+            with open(path, 'rb') as map_file:
+                map_gen = MapGenerator.from_bytes(map_file.read())
+            if (map_gen.seed, map_gen.width, map_gen.height) == (seed, width, height):
+                self.loads += 1
+                return map_gen
+        except (OSError, ValueError):
+            pass  # Missing or damaged, generate it again
+
+        map_gen = MapGenerator(width, height, seed)
+        self.generations += 1
+        self.store(map_gen)
+        return map_gen
+
+    def next_map(self, width: int, height: int) -> MapGenerator:
+        """
+        Map for a new game: a stored map not played this session if there is one,
+        otherwise a fresh seed while the pool has room, otherwise any stored map again
+        """
+        stored = self.seeds(width, height)
+        unplayed = [seed for seed in stored if seed not in self.played]
+        if unplayed:
+            seed = self.rng.choice(unplayed)
+        elif len(stored) < Config.MAP_POOL_SIZE:
+            seed = self.rng.getrandbits(32)
+        else:
+            # Every stored map was played, start the rotation over
+            self.played.clear()
+            seed = self.rng.choice(stored)
+        self.played.add(seed)
+        return self.get(seed, width, height)
+
+    def fill(self, count: int, width: int, height: int):
+        """Generate new maps until the pool holds count maps of this size"""
+        stored = set(self.seeds(width, height))
+        while len(stored) < count:
+            seed = self.rng.getrandbits(32)
+            if seed not in stored:
+                self.get(seed, width, height)
+                stored.add(seed)
+
+
+# Program Entry Point
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pregenerate maps into the on-disk map pool")
+    parser.add_argument('--count', type=int, default=Config.MAP_POOL_SIZE, help="maps the pool should hold")
+    args = parser.parse_args()
+
+    pool = MapPool()
+    pool.fill(args.count, Config.MAP_WIDTH, Config.MAP_HEIGHT)
+    print(f"{len(pool.seeds(Config.MAP_WIDTH, Config.MAP_HEIGHT))} maps in {pool.directory}")
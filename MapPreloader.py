@@ -0,0 +1,75 @@
+# Handles building the next game's map in the background, so a restart only swaps it in
+import threading
+from typing import List, Tuple, Optional, Dict, Callable, Type
+
+# Import the map and pathfinding classes from other modules
+from MapGen import MapGenerator, TileGrid
+from Pathfinding import Pathfinder, FlowField, IncrementalPlanner
+from PlacementAnalysis import PlacementAnalysis
+
+
+class PreparedMap:
+    """
+    A map with its tiles, cost grid, HPA* hierarchy (if enabled), shared flow field,
+    START paths and barricade preview already built
+    """
+    def __init__(self, map_gen: MapGenerator, goal: Tuple[int, int], field_class: Optional[Type[FlowField]]):
+        self.map_gen = map_gen
+        self.tiles = TileGrid(map_gen)
+        self.pathfinder = Pathfinder(map_gen.width, map_gen.height, map_gen)
+        if self.pathfinder.hierarchy:
+            # Build the HPA* clusters here instead of on the first query of the game
+            self.pathfinder.hierarchy.refresh()
+        self.flow_field: Optional[FlowField] = field_class(self.pathfinder, goal) if field_class else None
+
+        # START path previews, found the same way the game finds them
+        if self.flow_field:
+            paths = {start: self.flow_field.path_from(start) for start in map_gen.start_points}
+        else:
+            paths = self.pathfinder.find_paths_many(map_gen.start_points, goal)
+        self.start_paths: Dict[Tuple[int, int], List[Tuple[int, int]]] = {
+            start: path for start, path in paths.items() if path}
+
+        # Price the barricade preview here instead of on the first hover of the game
+        goal_field = self.flow_field if isinstance(self.flow_field, IncrementalPlanner) else None
+        self.placement = PlacementAnalysis(self.pathfinder, map_gen.start_points, goal, goal_field)
+        self.placement.refresh()
+
+
+class MapPreloader:
+    """
+    Keeps one PreparedMap for the next game, built in a background thread
+
+    start() begins a build while the current game runs and take() hands the
+    result over. A restart that comes before the build is done waits for the
+    rest of it instead of starting over.
+    """
+    def __init__(self, next_map: Callable[[], MapGenerator], goal: Tuple[int, int],
+                 field_class: Optional[Type[FlowField]]):
+        self.next_map = next_map  # Called on the background thread for each new map
+        self.goal = goal
+        self.field_class = field_class
+        self.ready: Optional[PreparedMap] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Begin building the next map unless one is already ready or being built"""
+        if self.ready is None and self.thread is None:
+            self.thread = threading.Thread(target=self._build, daemon=True)
+            self.thread.start()
+
+    def _build(self):
+        """Runs on the background thread"""
+        try:
+            self.ready = PreparedMap(self.next_map(), self.goal, self.field_class)
+        except Exception as error:
+            # take() reports no map and the game builds one itself
+            print(f"Could not prepare the next map: {error}")
+
+    def take(self) -> Optional[PreparedMap]:
+        """Hand over the prepared map, waiting for a build still in progress; None if the build failed"""
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        prepared, self.ready = self.ready, None
+        return prepared
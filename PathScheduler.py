@@ -0,0 +1,174 @@
+# Handles time-sliced path requests so replanning never stalls a whole frame
+import heapq
+import time
+from collections import OrderedDict
+from typing import List, Tuple, Optional, Callable, Hashable
+
+# Import Config and the pathfinding classes from other modules
+from Config import Config
+from Pathfinding import Pathfinder, IncrementalPlanner, IMPASSABLE_COST
+from PlacementAnalysis import PlacementAnalysis
+
+
+class FieldRepairJob:
+    """Resumable repair of an IncrementalPlanner after cost changes"""
+    def __init__(self, planner: IncrementalPlanner):
+        self.planner = planner
+        self.result = None
+
+    def step(self, max_expansions: int) -> bool:
+        """Settle up to max_expansions tiles, returns True once the field is consistent"""
+        return self.planner.compute(max_expansions)
+
+
+class PlacementRefreshJob:
+    """
+    Resumable PlacementAnalysis refresh, queries answer from the previous tables until it finishes
+    If the cost grid changes between steps the refresh starts over against the new costs.
+    """
+    def __init__(self, analysis: PlacementAnalysis):
+        self.analysis = analysis
+        self.result = None
+        self.version = -1  # cost_version the running refresh started against
+        self.steps = None
+
+    def step(self, max_expansions: int) -> bool:
+        """Do about max_expansions tiles of refresh work, returns True once the tables are up to date"""
+        if self.version != self.analysis.pathfinder.cost_version:
+            self.version = self.analysis.pathfinder.cost_version
+            self.steps = self.analysis.refresh_steps(max_expansions)
+        done = 0
+        for work in self.steps:
+            done += work
+            if done >= max_expansions:
+                return False
+        return True
+
+
+class PathRequest:
+    """
+    Resumable A* query with its own search state
+
+    Unlike Pathfinder.find_path it keeps g-scores and parents in dicts owned by
+    the request, so several requests can be in flight at once. If the cost grid
+    changes between steps the search starts over against the new costs. A weight
+    above 1 makes it a weighted A* search, see Pathfinder.find_path.
+    """
+    def __init__(self, pathfinder: Pathfinder, start: Tuple[int, int], goal: Tuple[int, int],
+                 weight: float = 1.0):
+        self.pathfinder = pathfinder
+        self.start = start
+        self.goal = goal
+        self.weight = weight
+        self.result: Optional[List[Tuple[int, int]]] = None
+        self._restart()
+
+    def _restart(self):
+        """Discard search state and seed the start tile against the current costs"""
+        pathfinder = self.pathfinder
+        self.version = pathfinder.cost_version
+        self.g_scores = {}
+        self.parents = {}
+        self.closed = set()
+        self.open_list = []
+        self.expanded = 0
+        if pathfinder.is_walkable(*self.start) and pathfinder.is_walkable(*self.goal):
+            start_index = self.start[1] * pathfinder.width + self.start[0]
+            self.g_scores[start_index] = 0
+            self.parents[start_index] = -1
+            self.open_list.append((0, start_index))
+
+    def step(self, max_expansions: int) -> bool:
+        """Expand up to max_expansions tiles, returns True once the search has finished"""
+        pathfinder = self.pathfinder
+        if self.version != pathfinder.cost_version:
+            self._restart()
+
+        costs = pathfinder.costs
+        width = pathfinder.width
+        goal_x, goal_y = self.goal
+        goal_index = goal_y * width + goal_x
+        g_scores = self.g_scores
+        parents = self.parents
+        closed = self.closed
+        open_list = self.open_list
+
+        for _ in range(max_expansions):
+            if not open_list:
+                self.result = None  # No path exists
+                return True
+            _, current = heapq.heappop(open_list)
+            if current in closed:
+                continue
+            closed.add(current)
+            self.expanded += 1
+
+            if current == goal_index:
+                path = []
+                while current != -1:
+                    path.append((current % width, current // width))
+                    current = parents[current]
+                path.reverse()
+                self.result = path
+                if self.weight > 1:
+                    pathfinder.record_weighted_result(self.start, self.goal, path, self.expanded)
+                return True
+
+            current_g = g_scores[current]
+            for neighbor in pathfinder._neighbor_indices(current):
+                cost = costs[neighbor]
+                if cost >= IMPASSABLE_COST or neighbor in closed:
+                    continue
+                tentative_g = current_g + cost
+                if tentative_g < g_scores.get(neighbor, float('inf')):
+                    g_scores[neighbor] = tentative_g
+                    parents[neighbor] = current
+                    h = abs(neighbor % width - goal_x) + abs(neighbor // width - goal_y)
+                    heapq.heappush(open_list, (tentative_g + self.weight * h, neighbor))
+        return False
+
+
+class PathScheduler:
+    """
+    Queue of path jobs processed under a per-frame time budget
+
+    Requests with the same key share one job, so a burst of identical replans
+    costs a single search. Jobs that do not finish inside the budget resume on
+    the next frame; until then callers keep whatever path they already had.
+    """
+    def __init__(self, step_expansions: int = Config.PATH_STEP_EXPANSIONS):
+        self.step_expansions = step_expansions  # Expansions between budget checks
+        self.pending: OrderedDict = OrderedDict()  # Key -> (job, callbacks), oldest first
+
+        # Performance metrics
+        self.requests_merged = 0  # Requests answered by an already pending job
+        self.jobs_completed = 0  # Jobs finished since the scheduler was created
+        self.last_run_time = 0.0  # Seconds spent in the last run() call
+
+    def request(self, key: Hashable, job, callback: Callable) -> bool:
+        """Queue a job, returns False if an identical request was already pending"""
+        if key in self.pending:
+            callbacks = self.pending[key][1]
+            if callback not in callbacks:
+                callbacks.append(callback)
+            self.requests_merged += 1
+            return False
+        self.pending[key] = (job, [callback])
+        return True
+
+    def run(self, budget: float):
+        """Work on pending jobs until they are all done or the budget (in seconds) is spent"""
+        started = time.perf_counter()
+        deadline = started + budget
+        while self.pending and time.perf_counter() < deadline:
+            key, (job, callbacks) = next(iter(self.pending.items()))
+            if job.step(self.step_expansions):
+                del self.pending[key]
+                self.jobs_completed += 1
+                for callback in callbacks:
+                    callback(job.result)
+        self.last_run_time = time.perf_counter() - started
+
+    def clear(self):
+        """Drop every pending job without running its callbacks"""
+        self.pending.clear()
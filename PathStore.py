@@ -0,0 +1,126 @@
+# Handles shared, reference-counted storage of enemy paths
+from array import array
+from bisect import bisect_right
+from typing import List, Tuple, Dict
+
+# Import Config and the path post-processing from other modules
+from Config import Config
+from Pathfinding import compress_path
+
+
+class StoredPath:
+    """One interned route: its tiles plus the straight segments enemies walk along"""
+    __slots__ = ('tiles', 'corner_indices', 'corner_pixels',
+                 'segment_directions', 'segment_lengths', 'refcount', 'key')
+
+    def __init__(self, path: List[Tuple[int, int]], key: bytes):
+        self.key = key
+        self.refcount = 0
+
+        # Tiles as interleaved x, y values
+        self.tiles = array('H')
+        for x, y in path:
+            self.tiles.append(x)
+            self.tiles.append(y)
+
+        # Corners of the collapsed path, as tile indices and pixel centers
+        corners = compress_path(path)
+        self.corner_indices = array('I')
+        for index, tile in enumerate(path):
+            if tile == corners[len(self.corner_indices)]:
+                self.corner_indices.append(index)
+                if len(self.corner_indices) == len(corners):
+                    break
+        self.corner_pixels = array('d')
+        for x, y in corners:
+            self.corner_pixels.append(x * Config.TILE_SIZE + Config.TILE_SIZE / 2)
+            self.corner_pixels.append(y * Config.TILE_SIZE + Config.TILE_SIZE / 2)
+
+        # Segments run between consecutive corners and are always axis aligned
+        self.segment_directions = array('b')
+        self.segment_lengths = array('d')
+        for (x1, y1), (x2, y2) in zip(corners, corners[1:]):
+            steps = abs(x2 - x1) + abs(y2 - y1)
+            self.segment_directions.append((x2 > x1) - (x2 < x1))
+            self.segment_directions.append((y2 > y1) - (y2 < y1))
+            self.segment_lengths.append(steps * Config.TILE_SIZE)
+
+    def __len__(self) -> int:
+        return len(self.tiles) // 2
+
+    def tile(self, index: int) -> Tuple[int, int]:
+        """Get the (x, y) tile at a position along the path"""
+        return (self.tiles[2 * index], self.tiles[2 * index + 1])
+
+    def locate(self, index: int) -> Tuple[int, float]:
+        """Get (segment index, distance into that segment) of the tile at a position along the path"""
+        segment = bisect_right(self.corner_indices, index) - 1
+        if segment >= len(self.segment_lengths):
+            return len(self.segment_lengths), 0.0  # Final tile, nothing left to walk
+        return segment, (index - self.corner_indices[segment]) * Config.TILE_SIZE
+
+    def segment_point(self, segment: int, progress: float) -> Tuple[float, float]:
+        """Get the pixel position at a distance along one segment"""
+        return (self.corner_pixels[2 * segment] + self.segment_directions[2 * segment] * progress,
+                self.corner_pixels[2 * segment + 1] + self.segment_directions[2 * segment + 1] * progress)
+
+
+class PathStore:
+    """
+    Interns paths so enemies on the same route share one immutable copy
+
+    Enemies refer to a path by (path_id, index). A path that continues an
+    already stored route from one of its tiles is not stored again; it is
+    answered with the existing id and the offset of its first tile. Paths are
+    reference counted and dropped once no enemy uses them, so memory follows
+    the number of distinct routes rather than the number of enemies.
+    """
+    def __init__(self):
+        self.paths: Dict[int, StoredPath] = {}
+        self.by_key: Dict[bytes, int] = {}  # Tile bytes -> path id
+        self.by_goal: Dict[Tuple[int, int], List[int]] = {}  # Last tile -> ids of paths ending there
+        self.next_id = 1
+
+    def intern(self, path: List[Tuple[int, int]]) -> Tuple[int, int]:
+        """Store a path (or find a stored route it continues), returns (path_id, index) and holds a reference"""
+        goal = path[-1]
+        key = array('H', [value for tile in path for value in tile]).tobytes()
+
+        # Exact match, or the path is the tail of a stored route, which can only start len(path) tiles from its end
+        path_id = self.by_key.get(key)
+        index = 0
+        if path_id is None:
+            for candidate_id in self.by_goal.get(goal, ()):
+                candidate = self.paths[candidate_id]
+                if len(candidate) > len(path) and candidate.key.endswith(key):
+                    path_id = candidate_id
+                    index = len(candidate) - len(path)
+                    break
+
+        if path_id is None:
+            path_id = self.next_id
+            self.next_id += 1
+            self.paths[path_id] = StoredPath(path, key)
+            self.by_key[key] = path_id
+            self.by_goal.setdefault(goal, []).append(path_id)
+
+        self.paths[path_id].refcount += 1
+        return path_id, index
+
+    def release(self, path_id: int):
+        """Drop one reference, freeing the path once nothing uses it"""
+        stored = self.paths.get(path_id)
+        if stored is None:
+            return
+        stored.refcount -= 1
+        if stored.refcount <= 0:
+            del self.paths[path_id]
+            del self.by_key[stored.key]
+            goal = stored.tile(len(stored) - 1)
+            self.by_goal[goal].remove(path_id)
+            if not self.by_goal[goal]:
+                del self.by_goal[goal]
+
+    def get(self, path_id: int) -> StoredPath:
+        """Get a stored path by id"""
+        return self.paths[path_id]
@@ -0,0 +1,155 @@
+# Handles pathfinding in a background thread or process, off the game loop
+import atexit
+import multiprocessing
+import queue
+import threading
+from array import array
+from multiprocessing import shared_memory
+from typing import List, Tuple, Optional
+
+# Import the pathfinding classes from the Pathfinding module
+from Pathfinding import Pathfinder, FlowField
+
+
+# Snapshot layout: map epoch and cost_version (8 bytes each), then the cost grid
+HEADER_SIZE = 16
+
+
+def _read_snapshot(buffer, lock) -> Tuple[int, int, array]:
+    """Copy (epoch, cost_version, costs) out of a shared snapshot buffer"""
+    with lock:
+        epoch = int.from_bytes(buffer[0:8], 'little')
+        version = int.from_bytes(buffer[8:16], 'little')
+        costs = array('i')
+        costs.frombytes(bytes(buffer[HEADER_SIZE:]))
+    return epoch, version, costs
+
+
+def _worker_loop(width: int, height: int, buffer, lock, jobs, results):
+    """Serve jobs until a None job arrives; runs inside the worker thread or process"""
+    shm = None
+    if isinstance(buffer, str):
+        # Processes attach to the shared memory block by name
+        shm = shared_memory.SharedMemory(name=buffer)
+        buffer = shm.buf
+
+    pathfinder: Optional[Pathfinder] = None
+    running = True
+    while running:
+        # Newer jobs of the same kind supersede older ones still waiting in the queue
+        batch = {}
+        job = jobs.get()
+        while True:
+            if job is None:
+                running = False
+                break
+            batch[job[:2]] = job
+            try:
+                job = jobs.get_nowait()
+            except queue.Empty:
+                break
+
+        for job in batch.values():
+            epoch, version, costs = _read_snapshot(buffer, lock)
+            if pathfinder is None:
+                pathfinder = Pathfinder(width, height, costs=costs)
+            else:
+                pathfinder.costs = costs
+            pathfinder.cost_version = version
+
+            kind, key, goal = job[0], job[1], job[2]
+            if kind == 'field':
+                field = FlowField(pathfinder, goal)
+                results.put(('field', key, epoch, version,
+                             field.distances.tobytes(), field.next_steps.tobytes()))
+            elif kind == 'paths':
+                results.put(('paths', key, epoch, version, pathfinder.find_paths_many(job[3], goal)))
+
+    if shm is not None:
+        shm.close()
+
+
+class PathWorker:
+    """
+    Runs flow-field and batched path jobs in a background thread or process
+
+    Every submit copies the current cost grid into a shared snapshot buffer
+    tagged with the map epoch and cost_version. The worker reads the snapshot,
+    computes, and posts results to a queue that the game drains once per frame.
+    Results computed against an outdated snapshot are reported as such so the
+    caller can drop them.
+    """
+    def __init__(self, width: int, height: int, use_process: bool = False):
+        self.width = width
+        self.height = height
+        self.use_process = use_process
+        size = HEADER_SIZE + width * height * array('i').itemsize
+
+        if use_process:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.buffer = self.shm.buf
+            self.lock = multiprocessing.Lock()
+            self.jobs = multiprocessing.Queue()
+            self.results = multiprocessing.Queue()
+            self.worker = multiprocessing.Process(
+                target=_worker_loop, daemon=True,
+                args=(width, height, self.shm.name, self.lock, self.jobs, self.results))
+        else:
+            self.shm = None
+            self.buffer = bytearray(size)
+            self.lock = threading.Lock()
+            self.jobs = queue.Queue()
+            self.results = queue.Queue()
+            self.worker = threading.Thread(
+                target=_worker_loop, daemon=True,
+                args=(width, height, self.buffer, self.lock, self.jobs, self.results))
+
+        self.worker.start()
+        atexit.register(self.close)
+
+    def _write_snapshot(self, epoch: int, version: int, costs: array):
+        """Publish the current cost grid to the worker"""
+        with self.lock:
+            self.buffer[0:8] = epoch.to_bytes(8, 'little')
+            self.buffer[8:16] = version.to_bytes(8, 'little')
+            self.buffer[HEADER_SIZE:] = costs.tobytes()
+
+    def submit_field(self, pathfinder: Pathfinder, epoch: int, goal: Tuple[int, int]):
+        """Queue a full flow field toward goal over the pathfinder's current costs"""
+        self._write_snapshot(epoch, pathfinder.cost_version, pathfinder.costs)
+        self.jobs.put(('field', goal, goal))
+
+    def submit_paths(self, pathfinder: Pathfinder, epoch: int, key, starts: List[Tuple[int, int]],
+                     goal: Tuple[int, int]):
+        """Queue a batched find_paths_many query over the pathfinder's current costs"""
+        self._write_snapshot(epoch, pathfinder.cost_version, pathfinder.costs)
+        self.jobs.put(('paths', key, goal, list(starts)))
+
+    def poll(self) -> List[tuple]:
+        """Collect every result the worker has finished since the last poll"""
+        finished = []
+        while True:
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                return finished
+            if result[0] == 'field':
+                distances = array('d')
+                distances.frombytes(result[4])
+                next_steps = array('i')
+                next_steps.frombytes(result[5])
+                result = result[:4] + (distances, next_steps)
+            finished.append(result)
+
+    def close(self):
+        """Stop the worker and release the shared snapshot"""
+        if self.worker is None:
+            return
+        self.jobs.put(None)
+        self.worker.join(timeout=1.0)
+        self.worker = None
+        if self.shm is not None:
+            self.buffer = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
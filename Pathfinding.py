@@ -1,170 +1,984 @@
 # Handles pathfinding for enemy navigation using A* algorithm
 import heapq
-from typing import List, Tuple, Optional, Dict
+import sys
+from array import array
+from collections import OrderedDict
+from typing import List, Tuple, Optional, Dict, Set
 
-# Import Config and MapGenerator from other modules
+# Import Config, MapGenerator and TileGrid from other modules
 from Config import Config
-from MapGen import MapGenerator
-
-
-class Node:
-    """Node for A* algorithm - represents a single tile in the pathfinding grid"""
-    def __init__(self, x: int, y: int, cost: int = 1):
-        self.x = x  # X coordinate on the grid
-        self.y = y  # Y coordinate on the grid
-        self.cost = cost  # Movement cost to enter this tile (based on terrain type)
-        
-        # A* algorithm values
-        self.g = float('inf')  # Cost from start to this node
-        self.h = 0  # Heuristic cost from this node to goal
-        self.f = float('inf')  # Total cost (f = g + h)
-        self.parent = None  # Previous node in the path (for backtracking)
-    
-    def __lt__(self, other):
-        """Compare nodes by f-cost for priority queue"""
-        return self.f < other.f
-    
-    def __eq__(self, other):
-        """Nodes are equal if they have the same coordinates"""
-        if isinstance(other, Node):
-            return self.x == other.x and self.y == other.y
-        return False
-    
-    def __hash__(self):
-        """Hash by coordinates for set/dict usage"""
-        return hash((self.x, self.y))
-    
-    def reset(self):
-        """Reset node values for a new pathfinding search"""
-        self.g = float('inf')
-        self.h = 0
-        self.f = float('inf')
-        self.parent = None
+from MapGen import MapGenerator, TileGrid, TERRAIN_TYPES
+
+
+# Tiles with a movement cost at or above this value cannot be entered
+IMPASSABLE_COST = 100
+
+# Terrain code -> movement cost, unknown codes are impassable
+TERRAIN_COST_TABLE = bytes(Config.TERRAIN_COSTS.get(terrain, IMPASSABLE_COST)
+                           for terrain in TERRAIN_TYPES).ljust(256, bytes([IMPASSABLE_COST]))
+
+
+def costs_from_terrain(terrain: bytes) -> array:
+    """Turn a grid of terrain codes into an int cost grid in bulk, without a per-tile Python loop"""
+    # bytes.translate applies the lookup table to every tile at once
+    cost_bytes = terrain.translate(TERRAIN_COST_TABLE)
+
+    # Widen each one-byte cost into the low byte of a native int
+    itemsize = array('i').itemsize
+    wide = bytearray(len(cost_bytes) * itemsize)
+    low_byte = 0 if sys.byteorder == 'little' else itemsize - 1
+    wide[low_byte::itemsize] = cost_bytes
+    costs = array('i')
+    costs.frombytes(wide)
+    return costs
+
+
+def compress_path(path: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Collapse collinear runs of a tile path, keeping only its endpoints and corners"""
+    if len(path) < 3:
+        return list(path)
+    corners = [path[0]]
+    for previous, current, following in zip(path, path[1:], path[2:]):
+        # Keep a tile only where the direction of travel changes
+        if (current[0] - previous[0], current[1] - previous[1]) != (following[0] - current[0], following[1] - current[1]):
+            corners.append(current)
+    corners.append(path[-1])
+    return corners
 
 
 class Pathfinder:
-    """A* algorithm implementation for grid-based pathfinding"""
-    def __init__(self, width: int, height: int, map_gen: MapGenerator):
+    """
+    A* algorithm implementation for grid-based pathfinding
+
+    The grid lives in flat arrays indexed by y * width + x. Instead of resetting
+    every tile before a search, each search bumps a generation counter and a
+    tile's g-score and parent are only trusted when its stamp matches it.
+    """
+    def __init__(self, width: int, height: int, map_gen: Optional[MapGenerator] = None,
+                 costs: Optional[array] = None):
         self.width = width
         self.height = height
         self.map_gen = map_gen
-        self.nodes: Dict[Tuple[int, int], Node] = {}
-        
+        size = width * height
+
+        # Movement cost to enter each tile (based on terrain type), or a copy of given costs
+        if costs is not None:
+            self.costs = array('i', costs)
+        else:
+            self.costs = costs_from_terrain(map_gen.terrain)
+
+        # Per-search buffers, allocated once and reused by every search
+        self.g_scores = array('q', [0]) * size  # Cost from start to each tile
+        self.parents = array('i', [-1]) * size  # Previous tile in the path (for backtracking)
+        self.open_gen = array('I', [0]) * size  # Search generation in which each tile was reached
+        self.closed_gen = array('I', [0]) * size  # Search generation in which each tile was expanded
+        self.generation = 0
+
+        # Backward-search buffers for bidirectional mode, allocated on first use
+        self.bidirectional = Config.BIDIRECTIONAL_SEARCH
+        self.back_g_scores: Optional[array] = None  # Cost from each tile to the goal
+        self.back_next: Optional[array] = None  # Next tile on the way to the goal
+        self.back_open_gen: Optional[array] = None
+
+        # Optional extra cost added to every tile cost pushed through update_cost
+        self.overlay: Optional[array] = None
+
+        # Bumped on every real cost change so caches can tell when they are stale
+        self.cost_version = 0
+        self.cost_log: List[int] = []  # Flat index of each recent change, oldest first
+        self.cost_log_base = 0  # cost_version before the oldest logged change
+
+        # LRU cache of find_path results keyed by (start, goal, weight, cost_version)
+        self.path_cache: OrderedDict = OrderedDict()
+        self.cache_size = Config.PATH_CACHE_SIZE
+        self.cache_version = 0  # cost_version the cached entries were computed against
+        self.cache_hits = 0
+        self.cache_misses = 0
+
         # Performance metrics
         self.nodes_expanded = 0  # Number of nodes processed
         self.nodes_evaluated = 0  # Number of neighbor evaluations
         self.last_path_length = 0  # Length of the last found path
-        
-        # Initialize nodes for every tile in the grid
-        for x in range(width):
-            for y in range(height):
-                terrain = map_gen.get_tile(x, y)
-                # Get movement cost from config (100 = impassable)
-                cost = Config.TERRAIN_COSTS.get(terrain, 100)
-                self.nodes[(x, y)] = Node(x, y, cost)
-    
+
+        # Weighted search metrics, measured on every WEIGHTED_SAMPLE_EVERY-th weighted search when sampling is on
+        self.weighted_searches = 0
+        self.weighted_samples = 0
+        self.weighted_expanded_total = 0  # Tiles expanded by the sampled weighted searches
+        self.exact_expanded_total = 0  # Tiles expanded by their exact re-runs
+        self.weighted_cost_total = 0  # Route costs found by the sampled weighted searches
+        self.exact_cost_total = 0  # Optimal route costs for the same queries
+
+        # Optional cluster hierarchy (HPA*) answering unweighted find_path queries on large maps
+        self.hierarchy = None
+        if Config.HIERARCHICAL_SEARCH and size >= Config.HIERARCHICAL_MIN_TILES:
+            self.enable_hierarchical(Config.HPA_CLUSTER_SIZE)
+
+        # Optional landmark tables that tighten the A* heuristic
+        self.landmarks = None
+        if Config.NUM_LANDMARKS > 0:
+            self.enable_landmarks(Config.NUM_LANDMARKS)
+
+    def enable_hierarchical(self, cluster_size: int):
+        """
+        Answer unweighted find_path queries through an HPA* cluster hierarchy
+        Paths are near-optimal, not shortest. The hierarchy is built on the first
+        query unless hierarchy.refresh() is called ahead of time.
+        """
+        from HierarchicalPathfinding import HierarchicalPathfinder
+        self.hierarchy = HierarchicalPathfinder(self, cluster_size)
+
+    def enable_landmarks(self, count: int):
+        """Use landmark (ALT) lower bounds alongside Manhattan distance as the A* heuristic"""
+        from Landmarks import LandmarkHeuristic
+        self.landmarks = LandmarkHeuristic(self, count)
+
+    def set_overlay(self, overlay: Optional[array]):
+        """
+        Add a per-tile extra cost (e.g. a ThreatMap's costs) on top of every cost passed to update_cost
+        Only costs pushed after this call include it, so push every tile whose overlay is non-zero
+        """
+        self.overlay = overlay
+
     def update_cost(self, x: int, y: int, cost: int):
         """Update terrain cost for a specific tile (e.g., when terrain changes)"""
-        if (x, y) in self.nodes:
-            self.nodes[(x, y)].cost = cost
-    
+        if 0 <= x < self.width and 0 <= y < self.height:
+            index = y * self.width + x
+            if self.overlay is not None and cost < IMPASSABLE_COST:
+                # The overlay makes walkable tiles dearer but never blocks them
+                cost = min(cost + self.overlay[index], IMPASSABLE_COST - 1)
+            if self.costs[index] != cost:
+                self.costs[index] = cost
+                self.cost_version += 1
+                self.cost_log.append(index)
+                if len(self.cost_log) > Config.COST_LOG_SIZE:
+                    # Forget the oldest half, consumers that far behind rebuild from scratch
+                    dropped = len(self.cost_log) // 2
+                    del self.cost_log[:dropped]
+                    self.cost_log_base += dropped
+
+    @property
+    def weighted_speedup(self) -> float:
+        """Exact expansions per weighted expansion over the sampled searches (0 until sampled)"""
+        if not self.weighted_expanded_total:
+            return 0.0
+        return self.exact_expanded_total / self.weighted_expanded_total
+
+    @property
+    def weighted_cost_ratio(self) -> float:
+        """Weighted route cost over optimal route cost across the sampled searches (0 until sampled)"""
+        if not self.exact_cost_total:
+            return 0.0
+        return self.weighted_cost_total / self.exact_cost_total
+
+    def path_cost(self, path: List[Tuple[int, int]]) -> int:
+        """Total cost of walking a path (the start tile is free)"""
+        return sum(self.costs[y * self.width + x] for x, y in path[1:])
+
+    def record_weighted_result(self, start: Tuple[int, int], goal: Tuple[int, int],
+                               path: Optional[List[Tuple[int, int]]], expanded: int):
+        """
+        Count a finished weighted search, re-running it exactly when a sample is due
+        The exact re-run is a full search outside any frame budget, so sampling is off unless
+        Config.WEIGHTED_SAMPLE_EVERY is set for measuring
+        """
+        self.weighted_searches += 1
+        if not path or Config.WEIGHTED_SAMPLE_EVERY <= 0 or self.weighted_searches % Config.WEIGHTED_SAMPLE_EVERY:
+            return
+        nodes_expanded, nodes_evaluated = self.nodes_expanded, self.nodes_evaluated
+        exact_path = self._search(start, goal)
+        if exact_path:
+            self.weighted_samples += 1
+            self.weighted_expanded_total += expanded
+            self.exact_expanded_total += self.nodes_expanded
+            self.weighted_cost_total += self.path_cost(path)
+            self.exact_cost_total += self.path_cost(exact_path)
+        self.nodes_expanded, self.nodes_evaluated = nodes_expanded, nodes_evaluated
+
+    def changes_since(self, version: int) -> Optional[Set[int]]:
+        """
+        Flat indices of tiles whose cost changed after the given cost_version
+        Returns None if those changes are no longer logged
+        """
+        if version < self.cost_log_base:
+            return None
+        return set(self.cost_log[version - self.cost_log_base:])
+
     def is_walkable(self, x: int, y: int) -> bool:
         """Check if a tile is walkable (within bounds and cost < 100)"""
         # Check if coordinates are within the grid
         if not (0 <= x < self.width and 0 <= y < self.height):
             return False
         # Cost of 100 or higher means impassable terrain
-        return self.nodes[(x, y)].cost < 100
-    
+        return self.costs[y * self.width + x] < IMPASSABLE_COST
+
     def _manhattan(self, x1: int, y1: int, x2: int, y2: int) -> int:
         """Manhattan distance heuristic (sum of horizontal and vertical distance)"""
         return abs(x1 - x2) + abs(y1 - y2)
-    
-    def _neighbors(self, x: int, y: int) -> List[Tuple[int, int]]:
-        """Get 4-directional neighbors (up, down, left, right)"""
+
+    def _neighbor_indices(self, index: int) -> List[int]:
+        """Get flat indices of the 4-directional neighbors (left, right, up, down) inside the grid"""
+        width = self.width
+        x = index % width
         neighbors = []
-        # Check all four cardinal directions
-        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            nx, ny = x + dx, y + dy
-            if self.is_walkable(nx, ny):
-                neighbors.append((nx, ny))
+        if x > 0:
+            neighbors.append(index - 1)
+        if x < width - 1:
+            neighbors.append(index + 1)
+        if index >= width:
+            neighbors.append(index - width)
+        if index < len(self.costs) - width:
+            neighbors.append(index + width)
         return neighbors
-    
-    def _reset_nodes(self):
-        """Reset all nodes before starting a new pathfinding search"""
-        for node in self.nodes.values():
-            node.reset()
-    
-    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+
+    def _next_generation(self) -> int:
+        """Start a new search generation, clearing the stamps only when the counter wraps"""
+        self.generation += 1
+        if self.generation > 0xFFFFFFFF:
+            size = self.width * self.height
+            self.open_gen = array('I', [0]) * size
+            self.closed_gen = array('I', [0]) * size
+            if self.back_open_gen is not None:
+                self.back_open_gen = array('I', [0]) * size
+            self.generation = 1
+        return self.generation
+
+    def _reconstruct_path(self, index: int) -> List[Tuple[int, int]]:
+        """Follow parent pointers back from a tile and return the path in walking order"""
+        width = self.width
+        parents = self.parents
+        path = []
+        while index != -1:
+            path.append((index % width, index // width))
+            index = parents[index]
+        path.reverse()  # Path was built backwards, so reverse it
+        return path
+
+    def find_path(self, start: Tuple[int, int], goal: Tuple[int, int],
+                  weight: float = 1.0) -> Optional[List[Tuple[int, int]]]:
         """
         Find shortest path from start to goal using A* algorithm
+        A weight above 1 inflates the heuristic (weighted A*): far fewer tiles are
+        expanded and the path costs at most weight times the optimum
+        With hierarchical search enabled, unweighted queries go through HPA*
+        instead: paths are near-optimal rather than shortest, and the
+        bidirectional and landmark options do not apply to them
         Returns list of (x, y) coordinates or None if no path exists
         """
         # Validate that both start and goal positions are walkable
         if not self.is_walkable(start[0], start[1]) or not self.is_walkable(goal[0], goal[1]):
             return None
-        
-        # Reset all nodes from previous searches
-        self._reset_nodes()
-        
-        # Initialize start node
-        start_node = self.nodes[start]
-        start_node.g = 0  # No cost to reach starting position
-        start_node.h = self._manhattan(start[0], start[1], goal[0], goal[1])
-        start_node.f = start_node.h  # f = g + h
-        
-        # Priority queue of nodes to explore (ordered by f-cost)
-        open_list = [start_node]
-        open_set = {start}  # Fast lookup for nodes in open list
-        closed_set = set()  # Nodes already fully explored
-        
+
+        # Any cost change makes every cached path stale
+        if self.cache_version != self.cost_version:
+            self.path_cache.clear()
+            self.cache_version = self.cost_version
+
+        key = (start, goal, weight, self.cost_version)
+        if key in self.path_cache:
+            self.path_cache.move_to_end(key)
+            self.cache_hits += 1
+            self.nodes_expanded = 0
+            self.nodes_evaluated = 0
+            path = self.path_cache[key]
+            if path is None:
+                return None
+            self.last_path_length = len(path)
+            return list(path)  # Callers get their own copy of the cached path
+
+        self.cache_misses += 1
+        if self.hierarchy and weight == 1:
+            path = self.hierarchy.find_path(start, goal)
+            self.nodes_expanded = self.hierarchy.nodes_expanded
+            self.nodes_evaluated = self.hierarchy.nodes_evaluated
+            if path:
+                self.last_path_length = len(path)
+        elif weight > 1:
+            path = self._search(start, goal, weight)
+            self.record_weighted_result(start, goal, path, self.nodes_expanded)
+        elif self.bidirectional:
+            path = self._search_bidirectional(start, goal)
+        else:
+            path = self._search(start, goal)
+        if self.cache_size > 0:
+            self.path_cache[key] = path
+            if len(self.path_cache) > self.cache_size:
+                self.path_cache.popitem(last=False)  # Evict least recently used
+        return list(path) if path is not None else None
+
+    def _search(self, start: Tuple[int, int], goal: Tuple[int, int],
+                weight: float = 1.0) -> Optional[List[Tuple[int, int]]]:
+        """Run a fresh A* search between two walkable tiles with f = g + weight * h, bypassing the cache"""
+        # New generation invalidates every g-score and parent from previous searches
+        gen = self._next_generation()
+
+        width = self.width
+        costs = self.costs
+        g_scores = self.g_scores
+        parents = self.parents
+        open_gen = self.open_gen
+        closed_gen = self.closed_gen
+        goal_x, goal_y = goal
+        goal_index = goal_y * width + goal_x
+
+        # Initialize start tile
+        start_index = start[1] * width + start[0]
+        g_scores[start_index] = 0  # No cost to reach starting position
+        parents[start_index] = -1
+        open_gen[start_index] = gen
+        start_h = self._manhattan(start[0], start[1], goal_x, goal_y)
+
+        # Landmark bounds, when enabled, are never weaker than Manhattan distance
+        estimate = self.landmarks.heuristic_for(goal_index) if self.landmarks else None
+        if estimate:
+            start_h = max(start_h, estimate(start_index))
+
+        # Priority queue of (f, h, index); stale entries are skipped when popped
+        open_list = [(weight * start_h, start_h, start_index)]
+
         # Reset performance counters
-        self.nodes_expanded = 0
-        self.nodes_evaluated = 0
-        
+        expanded = 0
+        evaluated = 0
+
         # Main A* loop
         while open_list:
-            # Get node with lowest f-cost
-            current = heapq.heappop(open_list)
-            open_set.discard((current.x, current.y))
-            closed_set.add((current.x, current.y))
-            self.nodes_expanded += 1
-            
+            # Get tile with lowest f-cost (ties go to the tile closer to the goal)
+            _, _, current = heapq.heappop(open_list)
+            if closed_gen[current] == gen:
+                continue  # Already fully explored through a cheaper entry
+            closed_gen[current] = gen
+            expanded += 1
+
             # Check if we've reached the goal
-            if current.x == goal[0] and current.y == goal[1]:
-                # Reconstruct path by following parent pointers
-                path = []
-                node = current
-                while node:
-                    path.append((node.x, node.y))
-                    node = node.parent
-                path.reverse()  # Path was built backwards, so reverse it
+            if current == goal_index:
+                self.nodes_expanded = expanded
+                self.nodes_evaluated = evaluated
+                path = self._reconstruct_path(current)
                 self.last_path_length = len(path)
                 return path
-            
-            # Explore all neighbors of current node
-            for nx, ny in self._neighbors(current.x, current.y):
-                # Skip if already fully explored
-                if (nx, ny) in closed_set:
+
+            current_g = g_scores[current]
+
+            # Explore all neighbors of current tile
+            for neighbor in self._neighbor_indices(current):
+                cost = costs[neighbor]
+                # Skip impassable tiles and tiles already fully explored
+                if cost >= IMPASSABLE_COST or closed_gen[neighbor] == gen:
                     continue
-                
-                neighbor = self.nodes[(nx, ny)]
-                # Calculate cost to reach neighbor through current node
-                tentative_g = current.g + neighbor.cost
-                self.nodes_evaluated += 1
-                
+
+                # Calculate cost to reach neighbor through current tile
+                tentative_g = current_g + cost
+                evaluated += 1
+
                 # If this path to neighbor is better than any previous one
-                if (nx, ny) not in open_set or tentative_g < neighbor.g:
-                    # Update neighbor with better path
-                    neighbor.parent = current
-                    neighbor.g = tentative_g
-                    neighbor.h = self._manhattan(nx, ny, goal[0], goal[1])
-                    neighbor.f = neighbor.g + neighbor.h
-                    
-                    # Add to open list if not already there
-                    if (nx, ny) not in open_set:
-                        heapq.heappush(open_list, neighbor)
-                        open_set.add((nx, ny))
-        
+                if open_gen[neighbor] != gen or tentative_g < g_scores[neighbor]:
+                    open_gen[neighbor] = gen
+                    g_scores[neighbor] = tentative_g
+                    parents[neighbor] = current
+                    h = abs(neighbor % width - goal_x) + abs(neighbor // width - goal_y)
+                    if estimate:
+                        h = max(h, estimate(neighbor))
+                    heapq.heappush(open_list, (tentative_g + weight * h, h, neighbor))
+
         # No path found (open list is empty and goal wasn't reached)
-        return None
\ No newline at end of file
+        self.nodes_expanded = expanded
+        self.nodes_evaluated = evaluated
+        return None
+
+    def _search_bidirectional(self, start: Tuple[int, int],
+                              goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Run a fresh bidirectional A* search (NBA*) between two walkable tiles, bypassing the cache
+
+        A forward search from the start and a backward search from the goal take
+        turns, each from the side with the smaller frontier. A popped tile is
+        rejected for good (by both sides) once its own f, or its g plus the other
+        side's smallest f minus its estimate back to that side's origin, reaches
+        the best meeting cost found so far. The search ends when either frontier
+        runs dry, and the best meeting cost is then optimal.
+        """
+        gen = self._next_generation()
+        size = self.width * self.height
+        if self.back_g_scores is None:
+            self.back_g_scores = array('q', [0]) * size
+            self.back_next = array('i', [-1]) * size
+            self.back_open_gen = array('I', [0]) * size
+
+        width = self.width
+        costs = self.costs
+        g_scores = self.g_scores
+        parents = self.parents
+        open_gen = self.open_gen
+        closed_gen = self.closed_gen  # Shared: tiles either side has expanded or rejected
+        back_g_scores = self.back_g_scores
+        back_next = self.back_next
+        back_open_gen = self.back_open_gen
+        start_x, start_y = start
+        goal_x, goal_y = goal
+        start_index = start_y * width + start_x
+        goal_index = goal_y * width + goal_x
+
+        # Forward search from the start, f = g + distance to goal
+        g_scores[start_index] = 0
+        parents[start_index] = -1
+        open_gen[start_index] = gen
+        start_h = self._manhattan(start_x, start_y, goal_x, goal_y)
+        forward_open = [(start_h, 0, start_index)]
+        forward_f = start_h  # Smallest f in the forward frontier
+
+        # Backward search from the goal over the grid walked in reverse, f = g + distance to start
+        back_g_scores[goal_index] = 0
+        back_next[goal_index] = -1
+        back_open_gen[goal_index] = gen
+        backward_open = [(start_h, 0, goal_index)]
+        backward_f = start_h  # Smallest f in the backward frontier
+
+        best = 0 if start_index == goal_index else float('inf')  # Cheapest complete route seen so far
+        meeting = start_index if start_index == goal_index else -1
+
+        expanded = 0
+        evaluated = 0
+        while forward_open and backward_open:
+            if len(forward_open) <= len(backward_open):
+                _, _, current = heapq.heappop(forward_open)
+                if closed_gen[current] != gen:
+                    closed_gen[current] = gen
+                    current_g = g_scores[current]
+                    x = current % width
+                    y = current // width
+                    if (current_g + abs(x - goal_x) + abs(y - goal_y) < best and
+                            current_g + backward_f - abs(x - start_x) - abs(y - start_y) < best):
+                        expanded += 1
+                        for neighbor in self._neighbor_indices(current):
+                            cost = costs[neighbor]
+                            if cost >= IMPASSABLE_COST or closed_gen[neighbor] == gen:
+                                continue
+                            tentative_g = current_g + cost
+                            evaluated += 1
+                            if open_gen[neighbor] != gen or tentative_g < g_scores[neighbor]:
+                                open_gen[neighbor] = gen
+                                g_scores[neighbor] = tentative_g
+                                parents[neighbor] = current
+                                h = abs(neighbor % width - goal_x) + abs(neighbor // width - goal_y)
+                                heapq.heappush(forward_open, (tentative_g + h, -tentative_g, neighbor))
+                                if back_open_gen[neighbor] == gen and tentative_g + back_g_scores[neighbor] < best:
+                                    best = tentative_g + back_g_scores[neighbor]
+                                    meeting = neighbor
+                if forward_open:
+                    forward_f = forward_open[0][0]
+            else:
+                _, _, current = heapq.heappop(backward_open)
+                if closed_gen[current] != gen:
+                    closed_gen[current] = gen
+                    current_g = back_g_scores[current]
+                    x = current % width
+                    y = current // width
+                    if (current_g + abs(x - start_x) + abs(y - start_y) < best and
+                            current_g + forward_f - abs(x - goal_x) - abs(y - goal_y) < best):
+                        expanded += 1
+                        # Every neighbor reaches the goal by stepping into current first
+                        through_current = current_g + costs[current]
+                        for neighbor in self._neighbor_indices(current):
+                            if costs[neighbor] >= IMPASSABLE_COST or closed_gen[neighbor] == gen:
+                                continue
+                            evaluated += 1
+                            if back_open_gen[neighbor] != gen or through_current < back_g_scores[neighbor]:
+                                back_open_gen[neighbor] = gen
+                                back_g_scores[neighbor] = through_current
+                                back_next[neighbor] = current
+                                h = abs(neighbor % width - start_x) + abs(neighbor // width - start_y)
+                                heapq.heappush(backward_open, (through_current + h, -through_current, neighbor))
+                                if open_gen[neighbor] == gen and g_scores[neighbor] + through_current < best:
+                                    best = g_scores[neighbor] + through_current
+                                    meeting = neighbor
+                if backward_open:
+                    backward_f = backward_open[0][0]
+
+        self.nodes_expanded = expanded
+        self.nodes_evaluated = evaluated
+        if meeting == -1:
+            return None
+
+        # Forward half up to the meeting tile, then the backward half on to the goal
+        path = self._reconstruct_path(meeting)
+        index = back_next[meeting]
+        while index != -1:
+            path.append((index % width, index // width))
+            index = back_next[index]
+        self.last_path_length = len(path)
+        return path
+
+    def find_paths_many(self, starts: List[Tuple[int, int]],
+                        goal: Tuple[int, int]) -> Dict[Tuple[int, int], Optional[List[Tuple[int, int]]]]:
+        """
+        Answer many start -> goal queries with a single reverse Dijkstra from the goal
+        Returns a dict mapping each distinct start to its path (or None if no path exists)
+        """
+        results: Dict[Tuple[int, int], Optional[List[Tuple[int, int]]]] = {}
+        self.nodes_expanded = 0
+        self.nodes_evaluated = 0
+
+        # Identical start tiles share one answer
+        width = self.width
+        pending: Set[int] = set()
+        for start in dict.fromkeys(starts):
+            results[start] = None
+            if self.is_walkable(start[0], start[1]):
+                pending.add(start[1] * width + start[0])
+        if not pending or not self.is_walkable(goal[0], goal[1]):
+            return results
+
+        gen = self._next_generation()
+        costs = self.costs
+        g_scores = self.g_scores  # Here: cost from each tile to the goal
+        parents = self.parents  # Here: next tile on the way to the goal
+        open_gen = self.open_gen
+        closed_gen = self.closed_gen
+
+        goal_index = goal[1] * width + goal[0]
+        g_scores[goal_index] = 0
+        parents[goal_index] = -1
+        open_gen[goal_index] = gen
+        open_list = [(0, goal_index)]
+        remaining = len(pending)
+        expanded = 0
+        evaluated = 0
+
+        # Stop as soon as every requested start has been settled
+        while open_list and remaining:
+            distance, current = heapq.heappop(open_list)
+            if closed_gen[current] == gen:
+                continue
+            closed_gen[current] = gen
+            expanded += 1
+            if current in pending:
+                remaining -= 1
+
+            # Every neighbor reaches the goal by stepping into current first
+            through_current = distance + costs[current]
+            for neighbor in self._neighbor_indices(current):
+                if costs[neighbor] >= IMPASSABLE_COST or closed_gen[neighbor] == gen:
+                    continue
+                evaluated += 1
+                if open_gen[neighbor] != gen or through_current < g_scores[neighbor]:
+                    open_gen[neighbor] = gen
+                    g_scores[neighbor] = through_current
+                    parents[neighbor] = current
+                    heapq.heappush(open_list, (through_current, neighbor))
+
+        self.nodes_expanded = expanded
+        self.nodes_evaluated = evaluated
+
+        # Build the longest routes first so shorter ones can reuse their tails
+        built: Dict[int, Tuple[List[Tuple[int, int]], int]] = {}  # Tile -> (path, position in path)
+        settled = [index for index in pending if closed_gen[index] == gen]
+        settled.sort(key=lambda index: g_scores[index], reverse=True)
+        for start_index in settled:
+            path: List[Tuple[int, int]] = []
+            index = start_index
+            while index != -1:
+                if index in built:
+                    shared_path, position = built[index]
+                    path.extend(shared_path[position:])
+                    break
+                built[index] = (path, len(path))
+                path.append((index % width, index // width))
+                index = parents[index]
+            results[(start_index % width, start_index // width)] = path
+
+        return results
+
+
+class FlowField:
+    """
+    Distance-to-goal field shared by every enemy heading for the same goals
+
+    One reverse Dijkstra seeded from every goal at once stores, for every
+    walkable tile, the cost of the cheapest route to the nearest goal and the
+    neighbor to step into next, so following the field needs no search of its
+    own and each enemy ends up at whichever goal is cheapest for it.
+    """
+    def __init__(self, pathfinder: Pathfinder, *goals: Tuple[int, int]):
+        self.pathfinder = pathfinder
+        self.goals: List[Tuple[int, int]] = list(dict.fromkeys(goals))  # Every tile the field leads to
+        self.goal_indices: Set[int] = {y * pathfinder.width + x for x, y in goals}
+        size = pathfinder.width * pathfinder.height
+
+        self.distances = array('d', [float('inf')]) * size  # Cost of the cheapest route to the goal
+        self.next_steps = array('i', [-1]) * size  # Flat index of the neighbor to step into next
+
+        # Performance metrics
+        self.nodes_expanded = 0  # Number of tiles settled by the last compute
+
+        self.compute()
+
+    @property
+    def goal(self) -> Optional[Tuple[int, int]]:
+        """First goal, for callers that only ever use one"""
+        return self.goals[0] if self.goals else None
+
+    def add_goal(self, goal: Tuple[int, int]):
+        """Make another tile a goal and rebuild the field"""
+        index = goal[1] * self.pathfinder.width + goal[0]
+        if index not in self.goal_indices:
+            self.goals.append(goal)
+            self.goal_indices.add(index)
+            self.compute()
+
+    def remove_goal(self, goal: Tuple[int, int]):
+        """Stop leading to a tile and rebuild the field"""
+        index = goal[1] * self.pathfinder.width + goal[0]
+        if index in self.goal_indices:
+            self.goals.remove(goal)
+            self.goal_indices.discard(index)
+            self.compute()
+
+    def compute(self):
+        """Rebuild the whole field with a reverse Dijkstra seeded from every goal"""
+        pathfinder = self.pathfinder
+        size = pathfinder.width * pathfinder.height
+        costs = pathfinder.costs
+        distances = self.distances = array('d', [float('inf')]) * size
+        next_steps = self.next_steps = array('i', [-1]) * size
+        self.nodes_expanded = 0
+
+        # Every walkable goal starts at distance 0, the search then grows from all of them at once
+        open_list = []
+        for goal_index in self.goal_indices:
+            if costs[goal_index] < IMPASSABLE_COST:
+                distances[goal_index] = 0
+                open_list.append((0, goal_index))
+        expanded = 0
+
+        while open_list:
+            distance, current = heapq.heappop(open_list)
+            if distance > distances[current]:
+                continue  # Stale entry, tile was settled through a cheaper route
+            expanded += 1
+
+            # Every neighbor reaches the goal by stepping into current first
+            through_current = distance + costs[current]
+            for neighbor in pathfinder._neighbor_indices(current):
+                if costs[neighbor] >= IMPASSABLE_COST:
+                    continue
+                if through_current < distances[neighbor]:
+                    distances[neighbor] = through_current
+                    next_steps[neighbor] = current
+                    heapq.heappush(open_list, (through_current, neighbor))
+
+        self.nodes_expanded = expanded
+
+    def install(self, distances: array, next_steps: array):
+        """Replace the whole field with one computed elsewhere (e.g. by a background worker)"""
+        self.distances = distances
+        self.next_steps = next_steps
+
+    def distance(self, x: int, y: int) -> Optional[float]:
+        """Cost of the cheapest route from a tile to the nearest goal, or None if no goal is reachable"""
+        if not (0 <= x < self.pathfinder.width and 0 <= y < self.pathfinder.height):
+            return None
+        distance = self.distances[y * self.pathfinder.width + x]
+        return distance if distance != float('inf') else None
+
+    def next_waypoint(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """Tile to step into next from (x, y), or None at a goal or when no goal is reachable"""
+        if not (0 <= x < self.pathfinder.width and 0 <= y < self.pathfinder.height):
+            return None
+        next_index = self.next_steps[y * self.pathfinder.width + x]
+        if next_index == -1:
+            return None
+        return (next_index % self.pathfinder.width, next_index // self.pathfinder.width)
+
+    def path_from(self, start: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Follow the field from start to the nearest goal
+        Returns list of (x, y) coordinates or None if no path exists
+        """
+        if self.distance(start[0], start[1]) is None:
+            return None
+
+        width = self.pathfinder.width
+        next_steps = self.next_steps
+        goal_indices = self.goal_indices
+        max_steps = width * self.pathfinder.height  # A repair cut short can leave a loop behind
+        index = start[1] * width + start[0]
+        path = [start]
+        while index not in goal_indices:
+            index = next_steps[index]
+            if index == -1 or len(path) > max_steps:
+                return None  # The steps break off before a goal
+            path.append((index % width, index // width))
+        return path
+
+
+class IncrementalPlanner(FlowField):
+    """
+    Flow field that repairs itself after cost changes (LPA* rooted at the goal)
+
+    Alongside the distances (g) it keeps one-step lookahead values (rhs) and the
+    queue of inconsistent tiles between calls. update_cost only re-queues the
+    tiles next to the changed one, and compute() settles just the part of the
+    search tree whose distances actually changed. Goals are tiles whose
+    lookahead is pinned to 0, so adding or removing one is a change to a single
+    tile's lookahead and is repaired the same way. Reads never repair the field,
+    they see it as the last compute() left it.
+
+    A distance that rose cuts off every tile routed through it. Rather than
+    raising those tiles one heap entry at a time, compute() clears the whole
+    cut-off subtree in one sweep, re-derives each tile's lookahead from its
+    neighbors in a second, and lets the queue settle them like a Dijkstra
+    search over the cut-off region only. When the cut-off region grows past
+    Config.FIELD_REBUILD_FRACTION of the map, repairing costs more than
+    starting over, so the field is cleared and grown again from the goals.
+    """
+    def __init__(self, pathfinder: Pathfinder, *goals: Tuple[int, int]):
+        size = pathfinder.width * pathfinder.height
+        self.rhs = array('d', [float('inf')]) * size  # Best distance offered by the neighbors
+        self.open_list: List[Tuple[float, int]] = []  # Inconsistent tiles keyed by min(g, rhs)
+
+        # Subtree cut off by a risen distance, kept between calls so compute(max_expansions) can stop mid-sweep
+        self.cut_off: List[int] = []
+        self.cut_scanned = 0  # Tiles of cut_off whose routed-through neighbors were added
+        self.cut_rederived = 0  # Tiles of cut_off whose lookahead was re-derived
+        self.rebuild_limit = int(size * Config.FIELD_REBUILD_FRACTION)  # Cut-off tiles that make a rebuild cheaper
+
+        # Performance metrics
+        self.rebuilds = 0  # Repairs that started over from the goals
+
+        # compute() has nothing to settle yet, so this only allocates the field
+        super().__init__(pathfinder, *goals)
+
+        # Seed the goals, the first compute() then builds the full field
+        for goal_index in self.goal_indices:
+            self._update_tile(goal_index)
+        self.compute()
+
+    def add_goal(self, goal: Tuple[int, int]):
+        """Make another tile a goal, the next compute() spreads its pull to the tiles now closer to it"""
+        index = goal[1] * self.pathfinder.width + goal[0]
+        if index not in self.goal_indices:
+            self.goals.append(goal)
+            self.goal_indices.add(index)
+            self._update_tile(index)
+
+    def remove_goal(self, goal: Tuple[int, int]):
+        """Stop leading to a tile, the next compute() re-routes only the tiles that were headed for it"""
+        index = goal[1] * self.pathfinder.width + goal[0]
+        if index in self.goal_indices:
+            self.goals.remove(goal)
+            self.goal_indices.discard(index)
+            self._update_tile(index)
+
+    def _best_rhs(self, index: int) -> Tuple[float, int]:
+        """Recompute the lookahead value of a tile from its neighbors, returns (rhs, next step)"""
+        pathfinder = self.pathfinder
+        costs = pathfinder.costs
+        if costs[index] >= IMPASSABLE_COST:
+            return float('inf'), -1
+        if index in self.goal_indices:
+            return 0, -1
+
+        distances = self.distances
+        best = float('inf')
+        best_next = -1
+        for neighbor in pathfinder._neighbor_indices(index):
+            cost = costs[neighbor]
+            if cost >= IMPASSABLE_COST:
+                continue
+            candidate = distances[neighbor] + cost
+            if candidate < best:
+                best = candidate
+                best_next = neighbor
+        return best, best_next
+
+    def _start_over(self):
+        """Clear the field and queue only the goals, so the next compute() rebuilds it from scratch"""
+        inf = float('inf')
+        size = len(self.distances)
+        self.distances[:] = array('d', [inf]) * size
+        self.rhs[:] = array('d', [inf]) * size
+        self.next_steps[:] = array('i', [-1]) * size
+        self.open_list.clear()
+        self.cut_off.clear()
+        self.cut_scanned = self.cut_rederived = 0
+        self.rebuilds += 1
+        for goal_index in self.goal_indices:
+            self._update_tile(goal_index)
+
+    def _rebuild(self):
+        """Rebuild the field in one go with FlowField's search and mark every tile consistent"""
+        FlowField.compute(self)
+        self.rhs = array('d', self.distances)
+        self.open_list.clear()
+        self.cut_off.clear()
+        self.cut_scanned = self.cut_rederived = 0
+        self.rebuilds += 1
+
+    def _update_tile(self, index: int):
+        """Refresh a tile's lookahead value and queue it if it became inconsistent"""
+        self.rhs[index], self.next_steps[index] = self._best_rhs(index)
+        key = min(self.distances[index], self.rhs[index])
+        if self.distances[index] != self.rhs[index]:
+            heapq.heappush(self.open_list, (key, index))
+
+    def update_cost(self, x: int, y: int, cost: int):
+        """Change a tile's cost and queue only the tiles whose lookahead depends on it"""
+        pathfinder = self.pathfinder
+        if not (0 <= x < pathfinder.width and 0 <= y < pathfinder.height):
+            return
+        index = y * pathfinder.width + x
+        old_cost = pathfinder.costs[index]
+        pathfinder.update_cost(x, y, cost)
+        if pathfinder.costs[index] != old_cost:
+            self.cost_changed(index, old_cost)
+
+    def cost_changed(self, index: int, old_cost: int):
+        """
+        Queue the tiles affected by a cost the pathfinder already holds
+        Lets several planners over one pathfinder replay the same change
+        """
+        pathfinder = self.pathfinder
+        cost = pathfinder.costs[index]
+
+        # The tile's own lookahead only changes when it becomes (un)walkable
+        if (old_cost >= IMPASSABLE_COST) != (cost >= IMPASSABLE_COST):
+            self._update_tile(index)
+
+        # Neighbors pay the new cost to step into this tile
+        distances = self.distances
+        rhs = self.rhs
+        next_steps = self.next_steps
+        through_tile = distances[index] + cost
+        for neighbor in pathfinder._neighbor_indices(index):
+            if pathfinder.costs[neighbor] >= IMPASSABLE_COST:
+                continue
+            if cost < old_cost:
+                # Cheaper: the tile can only become a better next step
+                if through_tile < rhs[neighbor] and cost < IMPASSABLE_COST:
+                    rhs[neighbor] = through_tile
+                    next_steps[neighbor] = index
+                    if distances[neighbor] != through_tile:
+                        heapq.heappush(self.open_list, (min(distances[neighbor], through_tile), neighbor))
+            elif next_steps[neighbor] == index:
+                # Dearer: only neighbors routed through the tile need a new best step
+                self._update_tile(neighbor)
+
+    def compute(self, max_expansions: Optional[int] = None) -> bool:
+        """
+        Settle queued tiles until the field is consistent again
+        Returns True when the repair is complete, False if max_expansions ran out first
+        """
+        pathfinder = self.pathfinder
+        costs = pathfinder.costs
+        distances = self.distances
+        rhs = self.rhs
+        next_steps = self.next_steps
+        open_list = self.open_list
+        cut_off = self.cut_off
+        rebuild_limit = self.rebuild_limit
+        width = pathfinder.width
+        size = len(costs)
+        inf = float('inf')
+        neighbor_indices = pathfinder._neighbor_indices
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        expanded = 0
+
+        while open_list or cut_off:
+            if max_expansions is not None and expanded >= max_expansions:
+                self.nodes_expanded = expanded
+                return False
+
+            if cut_off:
+                if self.cut_scanned < len(cut_off):
+                    # First sweep: every tile stepping into a cut-off tile is cut off too. Only real
+                    # neighbors ever step into a tile, so indices wrapping around a map edge never match.
+                    scanned = self.cut_scanned
+                    while scanned < len(cut_off) <= rebuild_limit:
+                        if max_expansions is not None and expanded >= max_expansions:
+                            break
+                        tile = cut_off[scanned]
+                        scanned += 1
+                        expanded += 1
+                        for neighbor in (tile - 1, tile + 1, tile - width, tile + width):
+                            if neighbor < size and next_steps[neighbor] == tile:
+                                next_steps[neighbor] = -1  # Also keeps the sweep from adding a tile twice
+                                distances[neighbor] = inf
+                                cut_off.append(neighbor)
+                    self.cut_scanned = scanned
+                    if len(cut_off) > rebuild_limit:
+                        if max_expansions is None:
+                            # Nothing to time-slice, so the plain reverse Dijkstra rebuilds fastest
+                            self._rebuild()
+                            self.nodes_expanded += expanded
+                            return True
+                        self._start_over()
+                else:
+                    # Second sweep: with the whole subtree cleared, lookaheads only come from tiles outside it
+                    expanded += 1
+                    self._update_tile(cut_off[self.cut_rederived])
+                    self.cut_rederived += 1
+                    if self.cut_rederived == len(cut_off):
+                        cut_off.clear()
+                        self.cut_scanned = self.cut_rederived = 0
+                continue
+
+            key, current = heappop(open_list)
+            g = distances[current]
+            lookahead = rhs[current]
+            if g == lookahead or key != (g if g < lookahead else lookahead):
+                continue  # Consistent or superseded by a newer queue entry
+            expanded += 1
+
+            if g > lookahead:
+                # Overconsistent: distance dropped, offer it to the neighbors
+                distances[current] = lookahead
+                through_current = lookahead + costs[current]
+                for neighbor in neighbor_indices(current):
+                    if through_current < rhs[neighbor] and costs[neighbor] < IMPASSABLE_COST:
+                        rhs[neighbor] = through_current
+                        next_steps[neighbor] = current
+                        distance = distances[neighbor]
+                        if distance != through_current:
+                            heappush(open_list, (distance if distance < through_current else through_current, neighbor))
+            else:
+                # Underconsistent: distance rose, cut off the tile and everything routed through it
+                distances[current] = inf
+                next_steps[current] = -1
+                cut_off.append(current)
+
+        self.nodes_expanded = expanded
+        return True
+
+
+class CostTracker:
+    """
+    Change-tracking layer between the map tiles and a pathfinding cost store
+
+    Callers mark the tiles they touched, and flush() pushes only those costs to
+    the target (a Pathfinder or an IncrementalPlanner) instead of walking the
+    whole map after every change.
+    """
+    def __init__(self, tiles: TileGrid, target):
+        self.tiles = tiles
+        self.target = target  # Anything with update_cost(x, y, cost)
+        self.dirty: Set[Tuple[int, int]] = set()  # Tiles touched since the last flush
+
+    def mark_dirty(self, x: int, y: int):
+        """Record that a tile's cost may have changed"""
+        if (x, y) in self.tiles:
+            self.dirty.add((x, y))
+
+    def flush(self) -> List[Tuple[int, int]]:
+        """Push the costs of dirty tiles to the target, returns the tiles that were pushed"""
+        pushed = []
+        for x, y in self.dirty:
+            self.target.update_cost(x, y, self.tiles[(x, y)].get_cost())
+            pushed.append((x, y))
+        self.dirty.clear()
+        return pushed
+
+    @property
+    def cost_version(self) -> int:
+        """Version of the underlying cost grid, bumped on every real cost change"""
+        pathfinder = getattr(self.target, 'pathfinder', self.target)
+        return pathfinder.cost_version
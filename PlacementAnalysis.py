@@ -0,0 +1,435 @@
+# Handles barricade placement previews: what a barricade on a tile would do to each enemy route
+import heapq
+from array import array
+from typing import List, Tuple, Optional, Dict, Set, Iterator
+
+# Import Config and the pathfinding classes from other modules
+from Config import Config
+from Pathfinding import Pathfinder, IncrementalPlanner, IMPASSABLE_COST, TERRAIN_COST_TABLE
+
+
+SWEEP_CHUNK = 256  # Tiles a table sweep handles between yields of refresh_steps()
+
+
+class PlacementAnalysis:
+    """
+    Precomputed answer to "how much would a barricade here cost the enemies?"
+
+    Every START point keeps a field toward itself (forward costs) and shares a
+    field toward the base (backward costs), both repaired incrementally when
+    costs change. A barricade off a START's current route leaves its cost
+    unchanged. For a tile on the route, a detour can leave the route before the
+    tile along a cheapest walk from the START, cross one step, and rejoin after
+    it along a cheapest walk to the base. Each crossing covers a whole range of
+    route tiles, so one sorted sweep over all crossings bounds every route tile
+    at once, and a short search under that bound makes the answer exact.
+    Articulation points of the walkable grid mark the chokepoints no route can
+    avoid. Queries are table lookups.
+
+    refresh_steps() does a refresh in small units of work, so it can run as a
+    scheduler job while queries keep answering from the previous tables. Only
+    answers a cost change could have moved are priced again: a changed tile
+    can only lie on a route that costs at least the cheapest route through it,
+    before and after the change, so answers below both of those stand.
+    """
+    def __init__(self, pathfinder: Pathfinder, starts: List[Tuple[int, int]], goal: Tuple[int, int],
+                 goal_field: Optional[IncrementalPlanner] = None):
+        self.pathfinder = pathfinder
+        self.starts = list(starts)
+        self.goal = goal
+        self.version = -1  # cost_version the tables were priced against (-1 = never built)
+        self.costs = array('i')  # Costs last replayed into the owned fields, to know what each change replaced
+
+        # A field toward the goal can be shared with the game, its owner then feeds it the cost changes
+        self.goal_field = goal_field
+        self.owns_goal_field = goal_field is None
+        self.start_fields: Dict[Tuple[int, int], IncrementalPlanner] = {}
+        self.dfs_stale = True  # Walkability changed since the articulation data was built
+
+        # What the current tables were priced against, to tell which answers a change can have moved
+        self.priced_costs = array('i')
+        self.priced_goal_distances = array('d')
+        self.priced_start_distances: Dict[Tuple[int, int], array] = {}
+
+        # Query tables
+        self.route_costs: Dict[Tuple[int, int], Optional[float]] = {}  # Current cost per START (None = cut off)
+        self.barricaded_costs: Dict[Tuple[int, int], Dict[int, float]] = {}  # START -> route tile -> cost if barricaded
+        self.chokepoints: Set[int] = set()  # Route tiles whose loss cuts a START off from the base
+
+        # Articulation data from a DFS over walkable tiles rooted at the goal
+        self.dfs_parents = array('i')
+        self.discovery = array('i')
+        self.low = array('i')
+
+        # Performance metrics
+        self.refreshes = 0  # Incremental refreshes after cost changes
+        self.rebuilds = 0  # Full rebuilds from scratch
+        self.nodes_expanded = 0  # Tiles expanded by bounded detour searches
+        self.tiles_repriced = 0  # Route tiles priced again by the last refresh
+
+    def _new_field(self, goal: Tuple[int, int]) -> IncrementalPlanner:
+        """Empty field toward one tile, grown by the next compute() calls"""
+        field = IncrementalPlanner(self.pathfinder)
+        field.add_goal(goal)
+        return field
+
+    def refresh(self):
+        """Bring the analysis up to date with the pathfinder's costs in one go"""
+        for _ in self.refresh_steps(None):
+            pass
+
+    def refresh_steps(self, step_expansions: Optional[int] = Config.PATH_STEP_EXPANSIONS) -> Iterator[int]:
+        """
+        Bring the analysis up to date with the pathfinder's costs, yielding the work done (in tiles) as it goes
+        The new tables replace the old ones in the last step, so queries never see a half-priced state.
+        A caller that stops early must start over once the costs change again.
+        """
+        pathfinder = self.pathfinder
+        version = pathfinder.cost_version
+        if self.version == version:
+            return
+        changed = pathfinder.changes_since(self.version) if self.version >= 0 else None
+        if changed is None:
+            # Build the owned fields from scratch, the loop below grows them
+            self.costs = array('i', pathfinder.costs)
+            if self.owns_goal_field:
+                self.goal_field = self._new_field(self.goal)
+            self.start_fields = {start: self._new_field(start) for start in self.starts}
+            self.dfs_stale = True
+        else:
+            # Replay the changes into the owned fields; only walkability changes move articulation points
+            costs = pathfinder.costs
+            fields = list(self.start_fields.values())
+            if self.owns_goal_field:
+                fields.append(self.goal_field)
+            for index in changed:
+                old_cost = self.costs[index]
+                if old_cost == costs[index]:
+                    continue
+                if (old_cost >= IMPASSABLE_COST) != (costs[index] >= IMPASSABLE_COST):
+                    self.dfs_stale = True
+                for field in fields:
+                    field.cost_changed(index, old_cost)
+                self.costs[index] = costs[index]
+
+        # A shared goal field may still be mid-repair, finishing it here leaves its own job nothing to do
+        for field in [self.goal_field] + list(self.start_fields.values()):
+            done = False
+            while not done:
+                done = field.compute(step_expansions)
+                yield field.nodes_expanded
+        if self.dfs_stale:
+            yield from self._articulation_steps()
+            self.dfs_stale = False
+
+        yield from self._price_steps(changed)
+        self.version = version
+        if changed is None:
+            self.rebuilds += 1
+        else:
+            self.refreshes += 1
+
+    def _articulation_steps(self) -> Iterator[int]:
+        """Iterative DFS from the goal recording discovery times, low links and tree parents"""
+        pathfinder = self.pathfinder
+        costs = pathfinder.costs
+        size = len(costs)
+        parents = array('i', [-1]) * size
+        discovery = array('i', [-1]) * size
+        low = array('i', [-1]) * size
+
+        root = self.goal[1] * pathfinder.width + self.goal[0]
+        if costs[root] < IMPASSABLE_COST:
+            discovery[root] = low[root] = 0
+            counter = 1
+            stack = [(root, iter(pathfinder._neighbor_indices(root)))]
+            while stack:
+                if not counter % SWEEP_CHUNK:
+                    yield SWEEP_CHUNK
+                current, neighbors = stack[-1]
+                advanced = False
+                for neighbor in neighbors:
+                    if costs[neighbor] >= IMPASSABLE_COST:
+                        continue
+                    if discovery[neighbor] == -1:
+                        parents[neighbor] = current
+                        discovery[neighbor] = low[neighbor] = counter
+                        counter += 1
+                        stack.append((neighbor, iter(pathfinder._neighbor_indices(neighbor))))
+                        advanced = True
+                        break
+                    if neighbor != parents[current] and discovery[neighbor] < low[current]:
+                        low[current] = discovery[neighbor]  # Back edge
+                if not advanced:
+                    stack.pop()
+                    parent = parents[current]
+                    if parent != -1 and low[current] < low[parent]:
+                        low[parent] = low[current]
+        self.dfs_parents, self.discovery, self.low = parents, discovery, low
+
+    def _barricaded_cost(self, index: int) -> float:
+        """Cost a tile would get with a barricade on it, capped the same way Pathfinder.update_cost caps it"""
+        pathfinder = self.pathfinder
+        overlay = pathfinder.overlay
+        if pathfinder.map_gen is not None:
+            cost = TERRAIN_COST_TABLE[pathfinder.map_gen.terrain[index]]
+        else:
+            # No map to read the terrain from, take the overlay back out of the stored cost
+            cost = pathfinder.costs[index] - (overlay[index] if overlay is not None else 0)
+        cost += Config.BARRICADE_COST
+        if cost >= IMPASSABLE_COST:
+            return float('inf')
+        if overlay is not None:
+            cost = min(cost + overlay[index], IMPASSABLE_COST - 1)
+        return cost
+
+    def _cut_vertices_for(self, start_index: int) -> Set[int]:
+        """Tiles that separate a START from the goal: DFS ancestors whose child subtree has no way around them"""
+        parents = self.dfs_parents
+        discovery = self.discovery
+        low = self.low
+        cuts = set()
+        if discovery[start_index] == -1:
+            return cuts
+        child = start_index
+        ancestor = parents[child]
+        while ancestor != -1:
+            if parents[ancestor] != -1 and low[child] >= discovery[ancestor]:
+                cuts.add(ancestor)
+            child = ancestor
+            ancestor = parents[child]
+        return cuts
+
+    def _cost_avoiding(self, start_index: int, avoided: int, bound: float) -> Iterator[int]:
+        """
+        Cheapest route from a START to the goal that never enters one tile, or bound if none is cheaper
+        A* guided by the exact distances to the goal, so only near-optimal detours are expanded.
+        Yields its expansions in chunks and returns the cost.
+        """
+        pathfinder = self.pathfinder
+        costs = pathfinder.costs
+        goal_distances = self.goal_field.distances
+        goal_index = self.goal[1] * pathfinder.width + self.goal[0]
+        g_scores = {start_index: 0}
+        open_list = [(goal_distances[start_index], 0, start_index)]
+        expanded = 0
+        while open_list:
+            f, negative_g, current = heapq.heappop(open_list)
+            if f >= bound:
+                break
+            if current == goal_index:
+                bound = f
+                break
+            if -negative_g > g_scores[current]:
+                continue
+            expanded += 1
+            if expanded == SWEEP_CHUNK:
+                self.nodes_expanded += expanded
+                yield expanded
+                expanded = 0
+            for neighbor in pathfinder._neighbor_indices(current):
+                if neighbor == avoided or costs[neighbor] >= IMPASSABLE_COST:
+                    continue
+                tentative_g = -negative_g + costs[neighbor]
+                if tentative_g < g_scores.get(neighbor, float('inf')):
+                    g_scores[neighbor] = tentative_g
+                    # Deeper tiles first among equal f, there are many ties on a grid
+                    heapq.heappush(open_list, (tentative_g + goal_distances[neighbor], -tentative_g, neighbor))
+        self.nodes_expanded += expanded
+        yield expanded
+        return bound
+
+    def _through_cost(self, start: Tuple[int, int], index: int, costs, goal_distances, start_distances) -> float:
+        """Cheapest route from a START to the goal through a tile, under the given costs and distances"""
+        start_index = start[1] * self.pathfinder.width + start[0]
+        return start_distances[index] - costs[start_index] + costs[index] + goal_distances[index]
+
+    def _unmoved_answers(self, start: Tuple[int, int], route: List[int],
+                         changed: Optional[Set[int]]) -> Dict[int, float]:
+        """
+        Previous answers for route tiles that the changed tiles cannot have moved
+        A changed tile can only matter to a barricaded route that costs at least the cheapest route
+        through the tile, so answers below that both before and after the change are still exact.
+        """
+        old_answers = self.barricaded_costs.get(start)
+        if not old_answers or changed is None or start not in self.priced_start_distances:
+            return {}
+        inf = float('inf')
+        costs = self.pathfinder.costs
+        goal_distances = self.goal_field.distances
+        start_distances = self.start_fields[start].distances
+        priced_costs = self.priced_costs
+        priced_goal_distances = self.priced_goal_distances
+        priced_start_distances = self.priced_start_distances[start]
+        old_limit = new_limit = inf
+        for index in changed:
+            old_through = self._through_cost(start, index, priced_costs, priced_goal_distances, priced_start_distances)
+            new_through = self._through_cost(start, index, costs, goal_distances, start_distances)
+            old_limit = min(old_limit, old_through)
+            new_limit = min(new_limit, new_through)
+        kept = {}
+        for index in route[1:]:
+            answer = old_answers.get(index)
+            if answer is not None and answer < old_limit and answer <= new_limit and index not in changed:
+                kept[index] = answer
+        return kept
+
+    def _bypass_steps(self, start: Tuple[int, int], route: List[int], goal_order: List[int]) -> Iterator[int]:
+        """
+        Cheapest single-crossing detour around every route position, yields its work and returns the list
+        A detour leaves the route along a cheapest walk from the START, crosses one step and rejoins
+        along a cheapest walk to the goal, bypassing every route tile in between.
+        """
+        pathfinder = self.pathfinder
+        costs = pathfinder.costs
+        size = len(costs)
+        goal_distances = self.goal_field.distances
+        inf = float('inf')
+        positions = {index: i for i, index in enumerate(route)}
+        start_index = route[0]
+
+        # Latest route position a cheapest walk toward the goal can first touch the route at.
+        # Ties are common on a grid, so every cheapest next step counts, not just the field's own.
+        rejoin = array('i', [-1]) * size
+        for count, index in enumerate(goal_order):
+            if not count % SWEEP_CHUNK:
+                yield SWEEP_CHUNK
+            position = positions.get(index, -1)
+            if position == -1:
+                distance = goal_distances[index]
+                for neighbor in pathfinder._neighbor_indices(index):
+                    if goal_distances[neighbor] + costs[neighbor] == distance and rejoin[neighbor] > position:
+                        position = rejoin[neighbor]
+            rejoin[index] = position
+
+        # Earliest route position a cheapest walk from the START can last touch the route at
+        start_distances = self.start_fields[start].distances
+        start_order = sorted((index for index in range(size) if start_distances[index] != inf),
+                             key=start_distances.__getitem__)
+        yield len(start_order)
+        leave = array('i', [-1]) * size
+        for count, index in enumerate(start_order):
+            if not count % SWEEP_CHUNK:
+                yield SWEEP_CHUNK
+            inherited = 0 if index == start_index else size
+            distance = start_distances[index]
+            for neighbor in pathfinder._neighbor_indices(index):
+                if start_distances[neighbor] + costs[neighbor] == distance and leave[neighbor] < inherited:
+                    inherited = leave[neighbor]
+            leave[index] = max(inherited, positions.get(index, -1))
+
+        # Every step u -> v that leaves the route at leave[u] and rejoins at rejoin[v]
+        # bypasses the route tiles strictly between them
+        start_cost = costs[start_index]
+        detours = []
+        for count, index in enumerate(start_order):
+            if not count % SWEEP_CHUNK:
+                yield SWEEP_CHUNK
+            left_at = leave[index]
+            forward_cost = start_distances[index] - start_cost + costs[index]
+            for neighbor in pathfinder._neighbor_indices(index):
+                joined_at = rejoin[neighbor]
+                if joined_at - left_at >= 2 and costs[neighbor] < IMPASSABLE_COST:
+                    detours.append((forward_cost + costs[neighbor] + goal_distances[neighbor],
+                                    left_at + 1, joined_at - 1))
+        detours.sort()
+        yield len(detours)
+
+        # Cheapest detour first; each route position takes the first detour that covers it
+        bypass = [inf] * len(route)
+        next_open = list(range(len(route) + 1))
+
+        def find_open(position: int) -> int:
+            root = position
+            while next_open[root] != root:
+                root = next_open[root]
+            while next_open[position] != root:
+                next_open[position], position = root, next_open[position]
+            return root
+
+        for cost, first, last in detours:
+            position = find_open(first)
+            while position <= last:
+                bypass[position] = cost
+                next_open[position] = position + 1
+                position = find_open(position + 1)
+        return bypass
+
+    def _price_steps(self, changed: Optional[Set[int]]) -> Iterator[int]:
+        """
+        Work out, for every START and every tile on its route, the route cost with that tile barricaded
+        Answers the changed tiles cannot have moved are carried over, the rest are priced again.
+        """
+        pathfinder = self.pathfinder
+        costs = pathfinder.costs
+        size = len(costs)
+        width = pathfinder.width
+        goal_distances = self.goal_field.distances
+        inf = float('inf')
+        goal_order = None  # Sorted only once some START needs its route priced again
+
+        route_costs = {}
+        barricaded_costs = {}
+        chokepoints = set()
+        repriced = 0
+        for start in self.starts:
+            route = self.goal_field.path_from(start)
+            if route is None:
+                route_costs[start] = None
+                barricaded_costs[start] = {}
+                continue
+            route = [y * width + x for x, y in route]
+            start_index = route[0]
+            base_cost = goal_distances[start_index]
+            route_costs[start] = base_cost
+            cuts = self._cut_vertices_for(start_index)
+            chokepoints.update(index for index in route[1:] if index in cuts)
+
+            barricaded = self._unmoved_answers(start, route, changed)
+            stale = [position for position in range(1, len(route)) if route[position] not in barricaded]
+            if stale:
+                if goal_order is None:
+                    # Tiles in order of cost to the goal, so each tile comes after the one it steps into
+                    goal_order = sorted((index for index in range(size) if goal_distances[index] != inf),
+                                        key=goal_distances.__getitem__)
+                    yield len(goal_order)
+                bypass = yield from self._bypass_steps(start, route, goal_order)
+
+                # Enemies either pay the barricade or take the cheapest way around it. A single
+                # crossing can miss detours through tiles whose own cheapest routes all use the
+                # barricaded tile, so a search bounded by the best known answer settles the rest.
+                for position in stale:
+                    index = route[position]
+                    best = min(base_cost - costs[index] + self._barricaded_cost(index), bypass[position])
+                    if index not in cuts and best > base_cost and position < len(route) - 1:
+                        best = yield from self._cost_avoiding(start_index, index, best)
+                    barricaded[index] = best
+                repriced += len(stale)
+            barricaded_costs[start] = barricaded
+
+        # Swap in the new tables with what they were priced against
+        self.route_costs = route_costs
+        self.barricaded_costs = barricaded_costs
+        self.chokepoints = chokepoints
+        self.priced_costs = costs[:]
+        self.priced_goal_distances = goal_distances[:]
+        self.priced_start_distances = {start: field.distances[:] for start, field in self.start_fields.items()}
+        self.tiles_repriced = repriced
+
+    def route_costs_if_barricaded(self, x: int, y: int) -> Dict[Tuple[int, int], Optional[float]]:
+        """Route cost from every START with a barricade on (x, y), None for STARTs already cut off"""
+        index = y * self.pathfinder.width + x
+        return {start: self.barricaded_costs[start].get(index, cost) if cost is not None else None
+                for start, cost in self.route_costs.items()}
+
+    def cost_increase_if_barricaded(self, x: int, y: int) -> float:
+        """Largest increase in any START's route cost that a barricade on (x, y) would cause"""
+        increase = 0
+        for start, cost in self.route_costs_if_barricaded(x, y).items():
+            if cost is not None:
+                increase = max(increase, cost - self.route_costs[start])
+        return increase
+
+    def is_chokepoint(self, x: int, y: int) -> bool:
+        """True if every route from some START has to pass through (x, y)"""
+        return y * self.pathfinder.width + x in self.chokepoints
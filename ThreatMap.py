@@ -0,0 +1,78 @@
+# Handles the tower threat layer: damage per second on every tile, for threat-aware routing
+import math
+from array import array
+from typing import List, Tuple
+
+# Import Config and Tower from other modules
+from Config import Config
+from Tower import Tower
+
+
+class ThreatMap:
+    """
+    Per-tile tower damage per second, kept as its own grid beside the terrain costs
+
+    Placing or removing a tower only rasterizes the tiles inside its range
+    circle. Alongside the DPS it keeps an integer cost overlay that a
+    Pathfinder can add to terrain costs, so threat-aware enemies weigh a
+    detour against the damage they would take on the way.
+    """
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        size = width * height
+        self.dps = array('d', [0.0]) * size  # Damage per second an enemy takes on each tile
+        self.costs = array('i', [0]) * size  # Extra movement cost derived from the DPS
+
+    @staticmethod
+    def tower_dps(tower: Tower) -> float:
+        """Damage per second a tower deals to a single target"""
+        return tower.damage * Config.FPS / tower.fire_rate
+
+    def _tiles_in_range(self, tower: Tower) -> List[Tuple[int, int]]:
+        """Tiles whose centers lie inside a tower's range circle, clipped to the map"""
+        tiles = []
+        reach = int(tower.range)
+        for dy in range(-reach, reach + 1):
+            y = tower.y + dy
+            if not 0 <= y < self.height:
+                continue
+            # Half-width of the circle on this row
+            span = int(math.sqrt(tower.range ** 2 - dy ** 2))
+            for x in range(max(0, tower.x - span), min(self.width, tower.x + span + 1)):
+                tiles.append((x, y))
+        return tiles
+
+    def _apply(self, tower: Tower, sign: int) -> List[Tuple[int, int]]:
+        """Add (or subtract) a tower's DPS on its range circle, returns the tiles whose cost overlay changed"""
+        dps = self.dps
+        costs = self.costs
+        tower_dps = sign * self.tower_dps(tower)
+        changed = []
+        for x, y in self._tiles_in_range(tower):
+            index = y * self.width + x
+            dps[index] = max(0.0, dps[index] + tower_dps)
+            cost = round(dps[index] * Config.THREAT_COST_PER_DPS)
+            if cost != costs[index]:
+                costs[index] = cost
+                changed.append((x, y))
+        return changed
+
+    def add_tower(self, tower: Tower) -> List[Tuple[int, int]]:
+        """Rasterize a new tower, returns the tiles whose cost overlay changed"""
+        return self._apply(tower, 1)
+
+    def remove_tower(self, tower: Tower) -> List[Tuple[int, int]]:
+        """Take a tower's DPS back off the grid, returns the tiles whose cost overlay changed"""
+        return self._apply(tower, -1)
+
+    def get_dps(self, x: int, y: int) -> float:
+        """Damage per second an enemy takes on a tile"""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.dps[y * self.width + x]
+        return 0.0
+
+    def threatened_tiles(self) -> List[Tuple[int, int]]:
+        """Every tile with a non-zero cost overlay"""
+        width = self.width
+        return [(index % width, index // width) for index, cost in enumerate(self.costs) if cost]
@@ -2,14 +2,22 @@ import pygame
 import sys
 import random
 import math
+from array import array
 from typing import List, Tuple, Optional, Dict, Set
 
 # Import Config from Config module
 from Config import Config
 
 # Import from other game modules
-from MapGen import MapGenerator, Tile
-from Pathfinding import Pathfinder
+from MapGen import MapGenerator
+from MapPool import MapPool
+from MapPreloader import MapPreloader, PreparedMap
+from Pathfinding import FlowField, IncrementalPlanner, CostTracker
+from PathScheduler import PathScheduler, FieldRepairJob, PathRequest, PlacementRefreshJob
+from PathWorker import PathWorker
+from PlacementAnalysis import PlacementAnalysis
+from ThreatMap import ThreatMap
+from Congestion import CongestionMap
 from Enemy import Enemy
 from Tower import Tower, ArrowTower, BombTower, Projectile, Explosion
 from Interface import InterfaceRenderer
@@ -64,26 +72,30 @@ class Game:
         self.renderer = InterfaceRenderer(self.screen, fonts, self.asset_loader)
         self.alert_manager = AlertManager()
         
-        # Map generation
-        self.map_gen = MapGenerator(Config.MAP_WIDTH, Config.MAP_HEIGHT)
-        self.start_points = self.map_gen.start_points
-        
-        # Tiles
-        self.tiles: Dict[Tuple[int, int], Tile] = {}
-        for y in range(Config.MAP_HEIGHT):
-            for x in range(Config.MAP_WIDTH):
-                terrain = self.map_gen.get_tile(x, y)
-                self.tiles[(x, y)] = Tile(x, y, terrain)
-        
-        # Pathfinding
-        self.pathfinder = Pathfinder(Config.MAP_WIDTH, Config.MAP_HEIGHT, self.map_gen)
-        
         # Entities
         self.enemies: List[Enemy] = []
         self.base_x = Config.MAP_WIDTH - 1
         self.base_y = Config.MAP_HEIGHT - 1
         self.base_health = Config.BASE_HEALTH
         
+        # Optional background worker that replans off the main loop
+        self.path_worker: Optional[PathWorker] = None
+        if Config.PATH_WORKER:
+            self.path_worker = PathWorker(Config.MAP_WIDTH, Config.MAP_HEIGHT,
+                                          use_process=Config.PATH_WORKER == 'process')
+        self.map_epoch = 0  # Bumped per map so late worker results for an old map are dropped
+        
+        # Map generation, served from the on-disk pool of pregenerated maps
+        self.map_pool = MapPool(Config.MAP_POOL_DIR)
+        
+        # Map, tiles and pathfinding; the next game's map is then built in the background
+        self.map_preloader: Optional[MapPreloader] = None
+        if Config.PRELOAD_NEXT_MAP:
+            self.map_preloader = MapPreloader(self._next_map, (self.base_x, self.base_y), self._field_class())
+        self._install_map(self._prepare_map())
+        if self.map_preloader:
+            self.map_preloader.start()
+        
         # Game state
         self.resources = Config.INITIAL_RESOURCES
         self.wave = 0
@@ -98,9 +110,6 @@ class Game:
         self.kills = 0
         self.score = 0
         
-        self.start_paths: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
-        self._recalculate_all_start_paths()
-        
         # Towers and projectiles
         self.towers: List[Tower] = []
         self.projectiles: List[Projectile] = []
@@ -208,21 +217,15 @@ class Game:
     
     def restart_game(self):
         """Restart the game with a new map"""
-        # Regenerate map
-        self.map_gen = MapGenerator(Config.MAP_WIDTH, Config.MAP_HEIGHT)
-        self.start_points = self.map_gen.start_points
-        
-        # Reset tiles
-        self.tiles: Dict[Tuple[int, int], Tile] = {}
-        for y in range(Config.MAP_HEIGHT):
-            for x in range(Config.MAP_WIDTH):
-                terrain = self.map_gen.get_tile(x, y)
-                self.tiles[(x, y)] = Tile(x, y, terrain)
-        
-        # Reset pathfinding
-        self.pathfinder = Pathfinder(Config.MAP_WIDTH, Config.MAP_HEIGHT, self.map_gen)
+        # Swap in the map prepared in the background, or build one now if there is none
+        prepared = self.map_preloader.take() if self.map_preloader else None
+        self._install_map(prepared or self._prepare_map())
+        if self.map_preloader:
+            self.map_preloader.start()
         
-        # Reset entities
+        # Reset entities, handing their routes back to the shared store
+        for enemy in self.enemies:
+            enemy.release_path()
         self.enemies: List[Enemy] = []
         self.base_health = Config.BASE_HEALTH
         
@@ -243,10 +246,6 @@ class Game:
         self.total_waves = Config.DIFFICULTY_WAVES[self.difficulty]
         self.difficulty_locked = False
         
-        # Recalculate paths
-        self.start_paths: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
-        self._recalculate_all_start_paths()
-        
         # Reset towers and projectiles
         self.towers: List[Tower] = []
         self.projectiles: List[Projectile] = []
@@ -256,12 +255,75 @@ class Game:
         # Clear alerts
         self.alert_manager.clear()
     
+    def _next_map(self) -> MapGenerator:
+        """Map for a new game, the configured seed's map if one is set"""
+        if Config.MAP_SEED is not None:
+            return self.map_pool.get(Config.MAP_SEED, Config.MAP_WIDTH, Config.MAP_HEIGHT)
+        return self.map_pool.next_map(Config.MAP_WIDTH, Config.MAP_HEIGHT)
+    
+    def _field_class(self) -> Optional[type]:
+        """Kind of shared flow field to build, None when every enemy runs its own A* query"""
+        if not Config.USE_FLOW_FIELD:
+            return None
+        # A background worker rebuilds whole fields, otherwise the field repairs itself in place
+        return FlowField if self.path_worker else IncrementalPlanner
+    
+    def _prepare_map(self) -> PreparedMap:
+        """Build the next map with its pathfinder, flow field, START paths and barricade preview on this thread"""
+        return PreparedMap(self._next_map(), (self.base_x, self.base_y), self._field_class())
+    
+    def _install_map(self, prepared: PreparedMap):
+        """Make a prepared map the current one"""
+        self.map_gen = prepared.map_gen
+        self.start_points = self.map_gen.start_points
+        self.tiles = prepared.tiles  # Viewed through the map's terrain and barricade grids
+        self._build_pathfinding(prepared)
+        self.start_paths: Dict[Tuple[int, int], List[Tuple[int, int]]] = dict(prepared.start_paths)
+    
+    def _build_pathfinding(self, prepared: PreparedMap):
+        """Take over the prepared pathfinder, flow field and barricade preview, and create the replanning machinery around them"""
+        self.pathfinder = prepared.pathfinder
+        self.map_epoch += 1
+        
+        # Shared distance field toward the base, followed by every enemy
+        self.flow_field: Optional[FlowField] = prepared.flow_field
+        
+        # Tiles whose cost changed since the last sync
+        if isinstance(self.flow_field, IncrementalPlanner):
+            self.cost_tracker = CostTracker(self.tiles, self.flow_field)
+        else:
+            self.cost_tracker = CostTracker(self.tiles, self.pathfinder)
+        
+        # Replans are time-sliced across frames
+        self.path_scheduler = PathScheduler()
+        
+        # What a barricade on each tile would do to the routes, priced with the map and
+        # refreshed by a scheduler job after cost changes
+        self.placement: PlacementAnalysis = prepared.placement
+        
+        # Tower damage per tile, added to path costs once a threat-aware difficulty is locked in
+        self.threat_map = ThreatMap(Config.MAP_WIDTH, Config.MAP_HEIGHT)
+        self.threat_routing = False
+        
+        # Enemies per tile, added to path costs in crowd mode
+        self.congestion = CongestionMap(Config.MAP_WIDTH, Config.MAP_HEIGHT)
+        self.congestion_timer = 0
+        
+        # Sum of the active extra cost layers, added on top of the terrain costs
+        self.path_overlay = array('i', [0]) * (Config.MAP_WIDTH * Config.MAP_HEIGHT)
+        self.pathfinder.set_overlay(self.path_overlay)
+        
+        # Enemies waiting on worker results, keyed by request
+        self.worker_waiting: Dict[Tuple[int, int], List[Enemy]] = {}
+    
     def start_wave(self):
         """Start new wave"""
         if self.wave < self.total_waves:
             # Lock difficulty selection once first wave starts
             if self.wave == 0:
                 self.difficulty_locked = True
+                if self.difficulty in Config.THREAT_AWARE_DIFFICULTIES:
+                    self._enable_threat_routing()
                 
             self.wave += 1
             self.wave_active = True
@@ -291,10 +353,9 @@ class Game:
             return
         
         tile.has_barricade = True
+        self.cost_tracker.mark_dirty(x, y)
         self.resources -= Config.BARRICADE_RESOURCE_COST
-        self._sync_pathfinder()
-        self._recalculate_paths()
-        self._recalculate_all_start_paths()
+        self._replan()
         self.alert_manager.add_alert("Barricade placed!", Config.ALERT_DURATION // 2)
     
     def remove_barricade(self, x: int, y: int):
@@ -302,9 +363,8 @@ class Game:
         tile = self.tiles.get((x, y))
         if tile and tile.has_barricade:
             tile.has_barricade = False
-            self._sync_pathfinder()
-            self._recalculate_paths()
-            self._recalculate_all_start_paths()
+            self.cost_tracker.mark_dirty(x, y)
+            self._replan()
     
     def place_tower(self, x: int, y: int, tower_type: str):
         """Place tower"""
@@ -330,7 +390,7 @@ class Game:
         # Check resources and place tower
         if tower_type == "arrow":
             if self.resources >= Config.TOWER_ARROW_COST:
-                self.towers.append(ArrowTower(x, y))
+                self._add_tower(ArrowTower(x, y))
                 self.resources -= Config.TOWER_ARROW_COST
                 self.alert_manager.add_alert("Arrow tower placed!", Config.ALERT_DURATION // 2)
             else:
@@ -338,32 +398,166 @@ class Game:
         
         elif tower_type == "bomb":
             if self.resources >= Config.TOWER_BOMB_COST:
-                self.towers.append(BombTower(x, y))
+                self._add_tower(BombTower(x, y))
                 self.resources -= Config.TOWER_BOMB_COST
                 self.alert_manager.add_alert("Bomb tower placed!", Config.ALERT_DURATION // 2)
             else:
                 self.alert_manager.add_alert("Not enough resources!", Config.ALERT_DURATION)
     
+    def _add_tower(self, tower: Tower):
+        """Add a tower and rasterize its range into the threat layer"""
+        self.towers.append(tower)
+        changed = self.threat_map.add_tower(tower)
+        if self.threat_routing and changed:
+            self._push_overlay(changed)
+            self._replan()
+    
+    def _enable_threat_routing(self):
+        """Make enemies weigh tower damage against detours from now on"""
+        self.threat_routing = True
+        threatened = self.threat_map.threatened_tiles()
+        if threatened:
+            self._push_overlay(threatened)
+            self._replan()
+    
+    def _update_congestion(self):
+        """Crowd mode: fold enemy occupancy into path costs, one shared replan per interval"""
+        self.congestion_timer += 1
+        if self.congestion_timer < Config.CONGESTION_INTERVAL:
+            return
+        self.congestion_timer = 0
+        changed = self.congestion.update(self.enemies)
+        if changed:
+            self._push_overlay(changed)
+            self._replan()
+    
+    def _push_overlay(self, tiles: List[Tuple[int, int]]):
+        """Re-sum the extra cost layers on some tiles and mark them dirty for the next sync"""
+        for x, y in tiles:
+            index = y * Config.MAP_WIDTH + x
+            cost = self.congestion.costs[index]
+            if self.threat_routing:
+                cost += self.threat_map.costs[index]
+            self.path_overlay[index] = cost
+            self.cost_tracker.mark_dirty(x, y)
+    
     def _sync_pathfinder(self):
         """Sync map costs to pathfinder"""
-        for (x, y), tile in self.tiles.items():
-            self.pathfinder.update_cost(x, y, tile.get_cost())
+        # Only tiles marked dirty since the last sync are pushed
+        self.cost_tracker.flush()
     
-    def _recalculate_paths(self):
-        """Recalculate paths for all enemies"""
+    def _replan(self):
+        """Push changed tile costs and queue new paths for enemies and START previews"""
+        self._sync_pathfinder()
+        if self.path_worker:
+            self._submit_worker_replan()
+        elif self.flow_field:
+            # Enemies keep their current paths until the field repair finishes
+            self.path_scheduler.request('flow_field', FieldRepairJob(self.flow_field), self._on_field_repaired)
+        else:
+            self._recalculate_paths()
+            self._recalculate_all_start_paths()
+        self._request_placement_refresh()
+    
+    def _request_placement_refresh(self):
+        """Queue a refresh of the barricade preview, which shows the last answer until it finishes"""
+        self.path_scheduler.request('placement', PlacementRefreshJob(self.placement), lambda _: None)
+    
+    def _submit_worker_replan(self):
+        """Hand the replan to the background worker, enemies keep their paths meanwhile"""
+        goal = (self.base_x, self.base_y)
+        if self.flow_field:
+            self.path_worker.submit_field(self.pathfinder, self.map_epoch, goal)
+            return
+        
+        self.worker_waiting = {}
         for enemy in self.enemies:
             if enemy.alive and not enemy.arrived:
-                grid_x = int(enemy.x / Config.TILE_SIZE)
-                grid_y = int(enemy.y / Config.TILE_SIZE)
-                path = self.pathfinder.find_path((grid_x, grid_y), (self.base_x, self.base_y))
+                tile = (int(enemy.x / Config.TILE_SIZE), int(enemy.y / Config.TILE_SIZE))
+                self.worker_waiting.setdefault(tile, []).append(enemy)
+        starts = list(self.worker_waiting) + list(self.start_points)
+        self.path_worker.submit_paths(self.pathfinder, self.map_epoch, 'replan', starts, goal)
+    
+    def _apply_worker_results(self):
+        """Apply paths the background worker finished since the last frame"""
+        for result in self.path_worker.poll():
+            kind, _, epoch, version = result[:4]
+            # Results for an older map or older costs are superseded by a newer job
+            if epoch != self.map_epoch or version != self.pathfinder.cost_version:
+                continue
+            if kind == 'field':
+                self.flow_field.install(result[4], result[5])
+                self._on_field_repaired(None)
+            else:
+                paths = result[4]
+                for tile, enemies in self.worker_waiting.items():
+                    self._apply_path(enemies, paths.get(tile))
+                self.worker_waiting = {}
+                self.start_paths = {start: paths[start] for start in self.start_points if paths.get(start)}
+    
+    def _on_field_repaired(self, _):
+        """Re-read every path from the freshly repaired flow field"""
+        self._recalculate_paths()
+        self._recalculate_all_start_paths()
+    
+    def _paths_to_base(self, starts: List[Tuple[int, int]]) -> Dict[Tuple[int, int], Optional[List[Tuple[int, int]]]]:
+        """Get paths from many tiles to the base with a single search"""
+        if self.flow_field:
+            # The field is repaired by its FieldRepairJob or installed by the worker, so it is only read here
+            return {start: self.flow_field.path_from(start) for start in starts}
+        return self.pathfinder.find_paths_many(starts, (self.base_x, self.base_y))
+    
+    def _recalculate_paths(self):
+        """Recalculate paths for all enemies"""
+        active = [e for e in self.enemies if e.alive and not e.arrived]
+        tiles = [(int(e.x / Config.TILE_SIZE), int(e.y / Config.TILE_SIZE)) for e in active]
+        
+        if self.flow_field:
+            paths = self._paths_to_base(tiles)
+            for enemy, tile in zip(active, tiles):
+                path = paths.get(tile)
                 if path:
                     enemy.set_path(path)
+            return
+        
+        self._request_paths(active, tiles)
+    
+    def _request_paths(self, enemies: List[Enemy], tiles: List[Tuple[int, int]]):
+        """
+        Queue one time-sliced request per occupied tile (per-query mode)
+        Enemies already on the move settle for a bounded-suboptimal route, START previews stay exact.
+        """
+        goal = (self.base_x, self.base_y)
+        waiting: Dict[Tuple[int, int], List[Enemy]] = {}
+        for enemy, tile in zip(enemies, tiles):
+            waiting.setdefault(tile, []).append(enemy)
+        for tile, group in waiting.items():
+            self.path_scheduler.request((tile, goal), PathRequest(self.pathfinder, tile, goal, Config.REPLAN_WEIGHT),
+                                        lambda path, group=group: self._apply_path(group, path))
+    
+    def _apply_path(self, enemies: List[Enemy], path: Optional[List[Tuple[int, int]]]):
+        """Hand a finished path to enemies that may have walked on while it was computed"""
+        if not path:
+            return
+        positions = {tile: i for i, tile in enumerate(path)}
+        strays = []
+        stray_tiles = []
+        for enemy in enemies:
+            if enemy.alive and not enemy.arrived:
+                tile = (int(enemy.x / Config.TILE_SIZE), int(enemy.y / Config.TILE_SIZE))
+                if tile in positions:
+                    enemy.set_path(path, positions[tile])
+                else:
+                    # Walked off the searched route, so plan again from where the enemy is now
+                    strays.append(enemy)
+                    stray_tiles.append(tile)
+        if strays:
+            self._request_paths(strays, stray_tiles)
     
     def _recalculate_all_start_paths(self):
         """Recalculate visualization paths from each START point"""
         self.start_paths = {}
-        for start_point in self.start_points:
-            path = self.pathfinder.find_path(start_point, (self.base_x, self.base_y))
+        for start_point, path in self._paths_to_base(self.start_points).items():
             if path:
                 self.start_paths[start_point] = path
     
@@ -383,7 +577,8 @@ class Game:
         enemy.health = Config.ENEMY_HEALTH + extra_health
         enemy.max_health = enemy.health
         
-        path = self.pathfinder.find_path(start_point, (self.base_x, self.base_y))
+        # START previews double as spawn paths, stale ones are kept while a replan is pending
+        path = self.start_paths.get(start_point) or self._paths_to_base([start_point]).get(start_point)
         if path:
             enemy.set_path(path)
             self.enemies.append(enemy)
@@ -396,6 +591,11 @@ class Game:
         # Update alert manager
         self.alert_manager.update()
         
+        # Apply background results, then work on queued requests within this frame's budget
+        if self.path_worker:
+            self._apply_worker_results()
+        self.path_scheduler.run(Config.PATH_BUDGET_MS / 1000)
+        
         # Spawn enemies
         if self.wave_active and self.enemies_spawned < self.enemies_to_spawn:
             self.spawn_timer += 1
@@ -416,6 +616,10 @@ class Game:
                     self.game_lost = True
                     self.alert_manager.clear()
         
+        # Spread crowds over alternative routes, recomputed on a throttled schedule
+        if Config.CROWD_MODE:
+            self._update_congestion()
+        
         # Update towers and create projectiles
         for tower in self.towers:
             projectile = tower.update(self.enemies)
@@ -446,7 +650,10 @@ class Game:
                 self.score += Config.SCORE_PER_KILL
                 self.resources += Config.KILL_REWARD
         
-        # Remove dead enemies (keep only alive ones)
+        # Remove dead enemies (keep only alive ones), freeing routes nobody follows anymore
+        for enemy in self.enemies:
+            if not enemy.alive:
+                enemy.release_path()
         self.enemies = [e for e in self.enemies if e.alive]
         
         # Check wave completion
@@ -496,6 +703,15 @@ class Game:
             self.ui_panel_x, 380, self.difficulty, self.difficulty_locked, mouse_pos
         )
         
+        # Render barricade preview for the hovered tile
+        map_x = (mouse_pos[0] - self.map_offset_x) // Config.TILE_SIZE
+        map_y = (mouse_pos[1] - self.map_offset_y) // Config.TILE_SIZE
+        tile = self.tiles.get((map_x, map_y))
+        if tile and not tile.has_barricade and tile.terrain != 'stone':
+            self.renderer.render_barricade_preview(self.ui_panel_x, 450,
+                                                   self.placement.cost_increase_if_barricaded(map_x, map_y),
+                                                   self.placement.is_chokepoint(map_x, map_y))
+        
         # Render alerts
         active_alerts = self.alert_manager.get_active_alerts()
         self.renderer.render_alerts(active_alerts)